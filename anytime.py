@@ -0,0 +1,115 @@
+'''
+Anytime search algorithm
+
+Generic algorithm that works on any graph of nodes with the node contract of astar. A first solution is found quickly
+by weighted A* with a large weight (close to greedy best first search). Then weighted A* is repeated with decreasing 
+weights; every run prunes all nodes whose f = g + h is not below the length of the best solution so far, so each 
+new solution is strictly shorter. The search ends when a run with weight 1 is complete (the best solution is optimal
+for an admissible heuristic), when a run finds no shorter solution, or when the deadline or the node budget is 
+exhausted.
+
+anytime() is a generator of the improving goal nodes, the last one yielded is always the best solution so far in the
+usual backtrack() format; anytimeSolve() returns the best goal found within the budget.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import heapq
+import time
+from itertools import count
+
+from WaterColorPuzzleAfg.game.heuristics import zero
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+
+Weights = (5, 3, 2, 1.5, 1)
+
+class Budget(object):
+    '''
+    Deadline and number of expansions left for all runs of one anytime search
+    '''
+    def __init__(self, seconds, nodes):
+        self.deadline = None if seconds is None else time.monotonic() + seconds
+        self.nodes = nodes
+
+    def exhausted(self):
+        if self.nodes is not None:
+            self.nodes -= 1
+            if self.nodes < 0:
+                return True
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+def anytime(start, h=zero, weights=Weights, seconds=None, nodes=None, stats=None):
+    '''
+    Start an anytime search on the given node start.
+    @param start: the node to start the search
+    @param h: admissible heuristic function h(node), used for pruning by the best solution
+    @param weights: decreasing weights of the runs of weighted A*
+    @param seconds: time budget of the whole search, None for no limit
+    @param nodes: number of expansions of the whole search, None for no limit
+    @param stats: optional instrument.Stats to collect counters and timing of the search
+    @return: generator of goal nodes, each with a shorter path than the one before
+    '''
+    budget = Budget(seconds, nodes)
+    best = None
+    for weight in weights:
+        goal, complete = search(start, h, weight, None if best is None else best.depth, budget, stats)
+        if goal is not None:
+            best = goal
+            yield goal
+        if not complete or goal is None or weight <= 1:
+            break
+    if stats is not None:
+        stats.finish(best)
+
+def anytimeSolve(start, h=zero, weights=Weights, seconds=None, nodes=None, stats=None):
+    '''
+    Run an anytime search until it ends or its budget is exhausted
+    @return: the best goal node found, None if no goal was found within the budget
+    '''
+    best = None
+    for best in anytime(start, h, weights, seconds, nodes, stats):
+        pass
+    return best
+
+def search(start, h, weight, bound, budget, stats=None):
+    '''
+    Weighted A* search that ignores all nodes with depth + h(node) >= bound
+    @return: tuple of the goal node (or None) and a flag that is False if the budget was exhausted
+    '''
+    tie = count()
+    explored = [(weight*h(start), next(tie), start)]
+    reached = {} if stats is None else stats.visitedDict()
+    reached[start] = 0
+    while explored:
+        if budget.exhausted():
+            return None, False
+        _, _, node = heapq.heappop(explored)
+        if reached[node] < node.depth:
+            continue
+        if node.isGoal():
+            return node, True
+        for child in (node.children() if stats is None else stats.children(node)):
+            g = reached.get(child)
+            if g is not None and g <= child.depth:
+                continue
+            hc = h(child)
+            if bound is not None and child.depth + hc >= bound:
+                continue
+            reached[child] = child.depth
+            heapq.heappush(explored, (child.depth + weight*hc, next(tie), child))
+        if stats is not None:
+            stats.expanded(len(explored), len(reached))
+    return None, True
+
+
+# test code
+if __name__ == "__main__":
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.game.heuristics import boundaries
+
+    start = State.create(4, 2, 16, pourAll=True)
+    print(f'start = {start}')
+    t = time.time()
+    for goal in anytime(start, boundaries, seconds=10):
+        print(f'anytime: time={time.time()-t:.3f} s, moves={len(backtrack(goal))-1}')
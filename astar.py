@@ -0,0 +1,73 @@
+'''
+A* search algorithm
+
+Generic algorithm that works on any graph of nodes. The nodes must provide the following instance operations:
+
+- node.isGoal():       returns true if node is a goal of the search
+- node.children():     generator of all child-nodes that can be reached from node
+- node.__eq__(other):  equal operator used within the dictionary of reached nodes
+- node.__hash__():     must correspond to equal for element testing in dictionary
+- node.parent:         the parent node of a node on the search path; only for backtracking
+- node.depth:          number of moves from start to node, that is the path cost g(node)
+
+The heuristic h(node) estimates the remaining moves to a goal, see module heuristics. With an admissible heuristic
+and weight=1 the solution is optimal; a weight > 1 (weighted A*) expands far less nodes and the solution is at most
+weight times longer than the optimal one.
+
+Implementation using heapq as priority queue of active nodes, ordered by f = g + weight*h.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import heapq
+from itertools import count
+
+from WaterColorPuzzleAfg.game.heuristics import zero
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+
+def astar(start, h=zero, weight=1, stats=None):
+    '''
+    Start an A* search on the given node start.
+    @param start: the node to start the search
+    @param h: heuristic function h(node), estimated number of moves to a goal
+    @param weight: weight of the heuristic, 1 for (optimal) A*
+    @param stats: optional instrument.Stats to collect counters and timing of the search
+    @return: the goal node if found, None else
+    '''
+    tie = count()            # tie breaker, nodes themselves are not comparable
+    explored = [(weight*h(start), next(tie), start)]
+    reached = {} if stats is None else stats.visitedDict()   # best depth g of any seen node
+    reached[start] = 0
+    while explored:
+        _, _, node = heapq.heappop(explored)
+        if reached[node] < node.depth:
+            continue         # outdated entry, node was reached by a shorter path meanwhile
+        if node.isGoal():
+            if stats is not None:
+                stats.finish(node)
+            return node
+        for child in (node.children() if stats is None else stats.children(node)):
+            g = reached.get(child)
+            if g is None or child.depth < g:
+                reached[child] = child.depth
+                heapq.heappush(explored, (child.depth + weight*h(child), next(tie), child))
+        if stats is not None:
+            stats.expanded(len(explored), len(reached))
+    if stats is not None:
+        stats.finish(None)
+    return None
+
+
+# test code
+if __name__ == "__main__":
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.game.heuristics import boundaries, misplaced
+    import time
+
+    start = State.create(4, 2, 16, pourAll=True)
+    print(f'start = {start}')
+    for (name, h, weight) in [('boundaries', boundaries, 1), ('boundaries', boundaries, 2), ('misplaced', misplaced, 1)]:
+        t = time.time()
+        goal = astar(start, h, weight)
+        print(f'astar {name} weight={weight}: time={time.time()-t:.3f} s, moves={len(backtrack(goal))-1}')
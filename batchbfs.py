@@ -0,0 +1,194 @@
+'''
+Vectorized breadth first search with NumPy
+
+Layer synchronous breadth first search of state.State in pourAll mode, where a whole layer of boards is expanded by
+array operations instead of one State at a time. A layer is a 3-D array boards[n, i, p] of color codes (board n,
+tube i, position p from the bottom; 0 is empty, the codes follow the order of the symbols). For all boards of a layer
+at once the operations compute:
+
+- lengths, top colors and top runs of all tubes and the goal check
+- the legal moves as mask over all tube pairs, with the same rules and order as State.moves()
+- the children by applying all pours
+- the canonical keys: every tube is packed into an integer, the tubes of a board are sorted
+- the deduplication within the layer (first occurrence in bfs order) and against all visited keys
+
+The layers are ordered like the FIFO queue of bfs, so the search returns the same goal and path as bfs(). Only the
+parent index and the action of every node are stored; the goal is rebuilt by replaying the actions from start with
+State.move(), so the result is a State with parent chain for backtrack().
+
+NumPy is an optional dependency: without it the module can be imported, but batchBfs() raises an ImportError.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class Batch(object):
+    '''
+    Vectorized operations on layers of boards of one puzzle
+    @ivar count: number of tubes
+    @ivar size: maximum number of color segments within a tube
+    @ivar codes: code (1, 2, ...) of every color symbol
+    @ivar weights: weight of every position to pack a tube into an integer
+    '''
+    def __init__(self, start):
+        self.count = start.tubeCount()
+        self.size = start.size
+        self.codes = {s: n+1 for n, s in enumerate(start.symbols)}
+        bits = len(start.symbols).bit_length()
+        if bits * self.size > 63:
+            raise ValueError('tubes too high to be packed into 64 bit keys')
+        self.weights = np.array([1 << (bits * (self.size-1-p)) for p in range(self.size)], dtype=np.int64)
+        self.positions = np.arange(self.size)
+        self.lower = np.tril(np.ones((self.count, self.count), dtype=bool), -1)
+        self.diagonal = np.eye(self.count, dtype=bool)
+
+    def encode(self, state):
+        '''
+        Array of the tubes of a single state
+        '''
+        boards = np.zeros((1, self.count, self.size), dtype=np.uint8)
+        for i, tube in enumerate(state.tubes):
+            boards[0, i, :len(tube)] = [self.codes[s] for s in tube]
+        return boards
+
+    def analyse(self, boards):
+        '''
+        @return: tuple of the arrays lengths, tops and runs (length of the top run) of all tubes, shape (N, T)
+        '''
+        lengths = np.count_nonzero(boards, axis=-1)
+        tops = np.take_along_axis(boards, np.maximum(lengths-1, 0)[..., None], -1)[..., 0]
+        # runs: number of segments above the last segment that differs from the top
+        differ = (self.positions < lengths[..., None]) & (boards != tops[..., None])
+        last = np.where(differ.any(-1), self.size-1 - np.argmax(differ[..., ::-1], -1), -1)
+        return lengths, tops, lengths - 1 - last
+
+    def pack(self, boards):
+        '''
+        Every tube packed into an integer, shape (N, T); equal tubes give equal integers
+        '''
+        return boards.astype(np.int64) @ self.weights
+
+    def keys(self, boards):
+        '''
+        Canonical keys of the boards: the sorted packed tubes of every board as a single void item, shape (N,)
+        '''
+        packed = np.sort(self.pack(boards), axis=1)
+        return np.ascontiguousarray(packed).view(np.dtype((np.void, 8 * self.count)))[:, 0]
+
+    def moves(self, boards, lengths, tops, runs):
+        '''
+        Legal moves of all boards like State.moves() in pourAll mode, ordered by board, source and target tube
+        @return: arrays n, i, j of the board index and the move (i, j)
+        '''
+        size = self.size
+        uniform = runs == lengths
+        packed = self.pack(boards)
+        equal = packed[:, :, None] == packed[:, None, :]
+        earlier = np.count_nonzero(equal & self.lower, axis=-1)
+        first = earlier == 0
+        # sources: first of identical tubes, not empty and not complete
+        source = first & (lengths > 0) & ~(uniform & (lengths == size))
+        # targets: first of identical tubes, or the second if the source is the first
+        target = first[:, None, :] | (equal & (earlier == 1)[:, None, :])
+        frLen = lengths[:, :, None]
+        toLen = lengths[:, None, :]
+        legal = (((toLen > 0) & (toLen < size) & (tops[:, :, None] == tops[:, None, :]))
+                 | ((toLen == 0) & ~uniform[:, :, None]))
+        legal &= source[:, :, None] & target & ~self.diagonal & (frLen > 0)
+        return np.nonzero(legal)
+
+    def apply(self, boards, lengths, tops, runs, n, i, j):
+        '''
+        Children of the boards n by the moves (i, j): the top run of tube i is poured up to the free capacity of j
+        '''
+        children = boards[n]
+        m = np.arange(len(n))
+        k = np.minimum(runs[n, i], self.size - lengths[n, j])
+        frLen = lengths[n, i][:, None]
+        toLen = lengths[n, j][:, None]
+        pos = self.positions
+        fr = children[m, i]
+        fr[(pos >= frLen - k[:, None]) & (pos < frLen)] = 0
+        children[m, i] = fr
+        to = children[m, j]
+        children[m, j] = np.where((pos >= toLen) & (pos < toLen + k[:, None]), tops[n, i][:, None], to)
+        return children
+
+def batchBfs(start, stats=None, maxDepth=None):
+    '''
+    Start a vectorized breadth first search on the given state start (pourAll mode).
+    @param start: the state to start the search
+    @param stats: optional instrument.Stats, updated once per layer
+    @param maxDepth: search is stopped after this depth; None for no limit
+    @return: the goal state with parent chain back to start if found, None else
+    @raise ImportError: if numpy is not installed
+    @raise ValueError: if start is not in pourAll mode
+    '''
+    if np is None:
+        raise ImportError('batchBfs needs numpy')
+    if not start.pourAll:
+        raise ValueError('batchBfs supports the pourAll mode only')
+    batch = Batch(start)
+    layer = batch.encode(start)
+    visited = batch.keys(layer)
+    layers = []   # for every depth: arrays of parent index, source and target tube of the nodes in bfs order
+    while True:
+        lengths, tops, runs = batch.analyse(layer)
+        goals = np.flatnonzero((runs == lengths).all(-1))
+        if goals.size:
+            goal = rebuild(start, layers, goals[0])
+            if stats is not None:
+                stats.finish(goal)
+            return goal
+        if len(layer) == 0 or (maxDepth is not None and len(layers) >= maxDepth):
+            if stats is not None:
+                stats.finish(None)
+            return None
+        n, i, j = batch.moves(layer, lengths, tops, runs)
+        children = batch.apply(layer, lengths, tops, runs, n, i, j)
+        keys = batch.keys(children)
+        # first occurrence within the layer in bfs order, then the ones not visited before
+        index = np.sort(np.unique(keys, return_index=True)[1])
+        index = index[~np.isin(keys[index], visited)]
+        visited = np.concatenate((visited, keys[index]))
+        layers.append((n[index], i[index], j[index]))
+        if stats is not None:
+            stats.expandedLayer(len(layer), len(n), len(index), len(visited))
+        layer = children[index]
+
+def rebuild(start, layers, k):
+    '''
+    Replay the actions from start to node k of the last layer
+    @return: the node with parent chain back to start
+    '''
+    actions = []
+    for parents, i, j in reversed(layers):
+        actions.append((int(i[k]), int(j[k])))
+        k = parents[k]
+    node = start
+    for action in reversed(actions):
+        node = node.move(*action)
+    return node
+
+
+# test code
+if __name__ == "__main__":
+    import random
+    import time
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.bfsearch import bfs, backtrack
+
+    for (size, empty, colors) in [(4, 2, 6), (4, 2, 8), (4, 2, 10)]:
+        random.seed(size*100 + colors)
+        start = State.create(size, empty, colors, pourAll=True)
+        print(f'--- create({size},{empty},{colors}), start = {start}')
+        for search in (bfs, batchBfs):
+            t = time.perf_counter()
+            goal = search(start)
+            moves = [node.action for node in reversed(backtrack(goal)[:-1])] if goal else None
+            print(f'{search.__name__:>8}: time={time.perf_counter()-t:.3f} s, moves={moves}')
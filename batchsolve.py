@@ -0,0 +1,236 @@
+'''
+Batch solver: command line tool that streams many boards through a pool of worker processes
+
+Boards are read from a file or stdin, one board per line, either as JSON object
+    {"id": "b1", "tubes": ["BFDC", "CB", "DECE", "BAB", "ACA", "DF", "DEF", "AFE", "", ""], "size": 4, "pourAll": true}
+or as text with comma separated tubes (empty tubes are empty fields, size is the longest tube)
+    BFDC,CB,DECE,BAB,ACA,DF,DEF,AFE,,
+The move mode of a board without the field pourAll is the one of State (legacy mode, pourAll=False), unless the
+option --pourAll is given.
+Empty lines and lines starting with # are skipped. For every board a JSON line is written as soon as it is solved:
+    {"id": ..., "status": "solved", "moves": [[0, 8], ...], "depth": 25, "expansions": 1234, "time": 0.05}
+status is one of solved, unsolvable, timeout, nodes (node budget exceeded) or error. Boards rejected by the
+pre-check of deadends.unsolvable() are unsolvable without a search and get the field reason. A line that can not be
+parsed gets status error with the line number as id and the field error; the following lines are solved as usual.
+A board is valid if tubes is a list of at least two strings and size, if given, an integer not smaller than the
+longest tube.
+
+Every board gets its own budget of time and expansions that is checked on every expansion, so a pathological board
+stops at its budget and never blocks the others.
+
+Usage:
+    python -m WaterColorPuzzleAfg.search.batchsolve boards.txt --algorithm astar --workers 4 --time 10 --nodes 1000000
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from queue import SimpleQueue
+
+from WaterColorPuzzleAfg.game.state import State
+from WaterColorPuzzleAfg.game.heuristics import heuristics
+from WaterColorPuzzleAfg.game.deadends import unsolvable
+from WaterColorPuzzleAfg.search.bfsearch import bfs, backtrack
+from WaterColorPuzzleAfg.search.dfsearch import dfs
+from WaterColorPuzzleAfg.search.astar import astar
+from WaterColorPuzzleAfg.search.idastar import idastar
+from WaterColorPuzzleAfg.search.bidisearch import bibfs
+
+# search functions by name; the informed searches get the heuristic h and weight
+algorithms = {
+    'bfs':     lambda start, h, weight: bfs(start),
+    'dfs':     lambda start, h, weight: dfs(start),
+    'bibfs':   lambda start, h, weight: bibfs(start),
+    'astar':   lambda start, h, weight: astar(start, h, weight),
+    'idastar': lambda start, h, weight: idastar(start, h, weight),
+}
+
+class BudgetExceeded(Exception):
+    '''
+    Raised within a search if the time or node budget of a board is exhausted
+    '''
+    pass
+
+class BudgetState(State):
+    '''
+    State that counts its expansions and checks the budget of the current board on every call of children() and
+    predecessors() and on every goal of goals(), so the backward search of bibfs stops at the budget as well.
+    The budget is a class attribute; every worker process solves only one board at a time.
+    '''
+    expansions = 0
+    maxExpansions = None
+    deadline = None
+
+    @staticmethod
+    def expand():
+        '''
+        Count an expansion and check the budget
+        @raise BudgetExceeded: if the budget is exhausted
+        '''
+        cls = BudgetState
+        cls.expansions += 1
+        if cls.maxExpansions is not None and cls.expansions > cls.maxExpansions:
+            raise BudgetExceeded('nodes')
+        if cls.deadline is not None and time.monotonic() > cls.deadline:
+            raise BudgetExceeded('timeout')
+
+    def children(self):
+        BudgetState.expand()
+        return State.children(self)
+
+    def predecessors(self):
+        BudgetState.expand()
+        return State.predecessors(self)
+
+    def goals(self):
+        for goal in State.goals(self):
+            if BudgetState.deadline is not None and time.monotonic() > BudgetState.deadline:
+                raise BudgetExceeded('timeout')
+            yield goal
+
+def parse(line, number, pourAll=False):
+    '''
+    Parse a board line
+    @param pourAll: move mode of a board without the field pourAll
+    @return: dictionary with id, tubes, size and pourAll; None for empty and comment lines
+    @raise ValueError: if the line is no valid board
+    '''
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line.startswith('{'):
+        board = json.loads(line)   # json.JSONDecodeError is a ValueError
+        if not isinstance(board, dict) or not isinstance(board.get('tubes'), list):
+            raise ValueError('board without list of tubes')
+    else:
+        board = {'tubes': line.split(',')}
+    tubes = board['tubes']
+    if len(tubes) < 2:
+        raise ValueError('board with less than two tubes')
+    if not all(isinstance(tube, str) for tube in tubes):
+        raise ValueError('tubes must be strings of color symbols')
+    board.setdefault('id', number)
+    board.setdefault('size', max(len(tube) for tube in tubes))
+    board.setdefault('pourAll', pourAll)
+    size = board['size']
+    if not isinstance(size, int) or isinstance(size, bool) or size < max(len(tube) for tube in tubes):
+        raise ValueError('size must be an integer not smaller than the longest tube')
+    if not isinstance(board['pourAll'], bool):
+        raise ValueError('pourAll must be true or false')
+    return board
+
+def solveBoard(board, algorithm, heuristic, weight, seconds, nodes, deadline=None):
+    '''
+    Solve a single board within its budget; runs in a worker process
+    @param seconds: time budget counted from the start of the solve, None for no limit
+    @param deadline: absolute end of the solve as time.time(), e.g. of a request that waited in the queue of the pool;
+                     None for no limit
+    @return: result dictionary
+    '''
+    t = time.monotonic()
+    BudgetState.expansions = 0
+    BudgetState.maxExpansions = nodes
+    BudgetState.deadline = t + seconds if seconds is not None else None
+    if deadline is not None:
+        end = t + deadline - time.time()
+        BudgetState.deadline = end if BudgetState.deadline is None else min(BudgetState.deadline, end)
+    result = {'id': board['id']}
+    if BudgetState.deadline is not None and t >= BudgetState.deadline:
+        # the deadline passed while the board waited for a worker
+        return dict(result, status='timeout', expansions=0, time=0.0)
+    try:
+        start = BudgetState(*board['tubes'], size=board['size'], pourAll=board['pourAll'])
+        reason = unsolvable(start)
+        goal = None if reason else algorithms[algorithm](start, heuristics[heuristic], weight)
+        if reason:
+            result['status'] = 'unsolvable'
+            result['reason'] = reason
+        elif goal is None:
+            result['status'] = 'unsolvable'
+        else:
+            path = backtrack(goal)
+            result['status'] = 'solved'
+            result['moves'] = [node.action for node in reversed(path[:-1])]
+            result['depth'] = len(path) - 1
+    except BudgetExceeded as e:
+        result['status'] = str(e)
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = repr(e)
+    result['expansions'] = BudgetState.expansions
+    result['time'] = round(time.monotonic() - t, 6)
+    return result
+
+def solveAll(lines, out, algorithm='astar', heuristic='boundaries', weight=1, seconds=None, nodes=None, workers=None,
+             pourAll=False):
+    '''
+    Solve all boards of the given lines on a process pool; every result is written to out as soon as it is solved,
+    even while the next line is not yet available. At most twice the number of workers boards are read ahead, so
+    input streams of any length can be processed.
+    @param pourAll: move mode of the boards without the field pourAll
+    '''
+    workers = workers or os.cpu_count() or 1
+    results = SimpleQueue()                          # result dictionaries for the writer thread, None at the end
+    slots = threading.Semaphore(2 * workers)         # boards submitted but not yet written
+
+    def done(future, id):
+        try:
+            result = future.result()
+        except Exception as e:   # e.g. a broken pool
+            result = {'id': id, 'status': 'error', 'error': repr(e)}
+        results.put(result)
+        slots.release()
+
+    writer = threading.Thread(target=write, args=(out, results))
+    writer.start()
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            for number, line in enumerate(lines):
+                try:
+                    board = parse(line, number, pourAll)
+                except Exception as e:
+                    results.put({'id': number, 'status': 'error', 'error': repr(e)})
+                    continue
+                if board is None:
+                    continue
+                slots.acquire()
+                future = pool.submit(solveBoard, board, algorithm, heuristic, weight, seconds, nodes)
+                future.add_done_callback(lambda future, id=board['id']: done(future, id))
+    finally:
+        results.put(None)
+        writer.join()
+
+def write(out, results):
+    '''
+    Write the results of the queue as JSON lines until None is received; runs in a thread of its own
+    '''
+    for result in iter(results.get, None):
+        out.write(json.dumps(result) + '\n')
+        out.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve water-sort-puzzle boards in batch')
+    parser.add_argument('input', nargs='?', default='-', help='board file, - for stdin')
+    parser.add_argument('--algorithm', choices=sorted(algorithms), default='astar')
+    parser.add_argument('--heuristic', choices=sorted(heuristics), default='boundaries')
+    parser.add_argument('--weight', type=float, default=1)
+    parser.add_argument('--time', type=float, default=None, help='time budget per board in seconds')
+    parser.add_argument('--nodes', type=int, default=None, help='budget of expansions per board')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes, default: cores')
+    parser.add_argument('--pourAll', action='store_true', help='move mode pourAll for boards without the field')
+    args = parser.parse_args(argv)
+    lines = sys.stdin if args.input == '-' else open(args.input)
+    with lines:
+        solveAll(lines, sys.stdout, args.algorithm, args.heuristic, args.weight, args.time, args.nodes, args.workers,
+                 args.pourAll)
+
+
+if __name__ == "__main__":
+    main()
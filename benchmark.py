@@ -0,0 +1,156 @@
+'''
+Reproducible benchmark suite of the State hot paths and the search algorithms
+
+The corpus consists of seeded boards of several sizes, created by State.create. Measured are
+- micro benchmarks: __hash__, move, children and isGoal on the states of a fixed random walk (ns per call)
+- end to end: bfs, dfs and astar on the pourAll version of every board, stopped after a budget of expansions;
+  nodes per second (best of repeat runs), peak memory (tracemalloc) and solution length
+
+The results are written as JSON (--save) and compared with a saved baseline (--baseline); a slowdown or memory 
+growth beyond the tolerance, or a longer solution, is reported as regression and the exit code is 1. 
+
+Usage:
+    python -m WaterColorPuzzleAfg.game.benchmark --save baseline.json
+    python -m WaterColorPuzzleAfg.game.benchmark --baseline baseline.json --tolerance 0.2
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from WaterColorPuzzleAfg.game.state import State
+from WaterColorPuzzleAfg.game.heuristics import boundaries
+from WaterColorPuzzleAfg.search.bfsearch import bfs, backtrack
+from WaterColorPuzzleAfg.search.dfsearch import dfs
+from WaterColorPuzzleAfg.search.astar import astar
+from WaterColorPuzzleAfg.search.batchsolve import BudgetState, BudgetExceeded
+
+# corpus: (sizeOfTube, emptyTubes, numColors, seed)
+corpus = [(4, 2, 5, 1), (4, 2, 12, 2), (5, 2, 8, 3), (6, 2, 16, 4)]
+searches = {'bfs': bfs, 'dfs': dfs, 'astar': lambda start: astar(start, boundaries)}
+
+def board(size, empty, colors, seed, pourAll=False):
+    random.seed(seed)
+    return State.create(size, empty, colors, pourAll=pourAll)
+
+def walk(start, steps, seed):
+    '''
+    States of a seeded random walk from start
+    '''
+    rnd = random.Random(seed)
+    states = [start]
+    for _ in range(steps):
+        children = list(states[-1].children())
+        if not children:
+            break
+        states.append(rnd.choice(children))
+    return states
+
+def timeit(fn, states, repeat):
+    '''
+    Best time of repeat runs of fn over all states, in ns per call
+    '''
+    best = None
+    gc.disable()
+    for _ in range(repeat):
+        t = time.perf_counter_ns()
+        for state in states:
+            fn(state)
+        t = (time.perf_counter_ns() - t) / len(states)
+        best = t if best is None else min(best, t)
+    gc.enable()
+    return best
+
+def micro(results, name, start, repeat):
+    states = walk(start, 200, 0)
+    n = start.tubeCount()
+    results[f'micro/{name}/hash'] = timeit(hash, states, repeat)
+    results[f'micro/{name}/move'] = timeit(lambda state: state.move(0, n-1), states, repeat)
+    results[f'micro/{name}/children'] = timeit(lambda state: list(state.children()), states, repeat)
+    results[f'micro/{name}/isGoal'] = timeit(lambda state: state.isGoal(), states, repeat)
+
+def endToEnd(results, name, start, budget, repeat):
+    for alg, search in searches.items():
+        for traced in [False]*repeat + [True]:
+            node = BudgetState(*start.tubes, size=start.size, pourAll=start.pourAll)
+            BudgetState.expansions, BudgetState.maxExpansions, BudgetState.deadline = 0, budget, None
+            if traced:
+                tracemalloc.start()
+            t = time.perf_counter()
+            try:
+                goal = search(node)
+            except BudgetExceeded:
+                goal = None
+            t = time.perf_counter() - t
+            if traced:
+                results[f'e2e/{alg}/{name}/peakMemory'] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            else:
+                key = f'e2e/{alg}/{name}/nodesPerSec'
+                results[key] = max(results.get(key, 0), BudgetState.expansions / t)
+                results[f'e2e/{alg}/{name}/moves'] = None if goal is None else len(backtrack(goal)) - 1
+
+def run(repeat=6, budget=5000):
+    results = {}
+    for (size, empty, colors, seed) in corpus:
+        name = f'create({size},{empty},{colors})'
+        micro(results, name, board(size, empty, colors, seed), repeat)
+        endToEnd(results, name, board(size, empty, colors, seed, pourAll=True), budget, max(repeat//2, 1))
+    return results
+
+def compare(results, baseline, tolerance):
+    '''
+    Compare the results with the baseline
+    @return: list of regression messages
+    '''
+    regressions = []
+    for key, value in results.items():
+        old = baseline.get(key)
+        if old is None or value is None:
+            if key.endswith('/moves') and value is None and old is not None:
+                regressions.append(f'{key}: no solution within budget, baseline {old}')
+            continue
+        if key.endswith('/nodesPerSec'):
+            bad = value < old / (1 + tolerance)
+        elif key.endswith('/moves'):
+            bad = value > old
+        else:
+            bad = value > old * (1 + tolerance)
+        if bad:
+            regressions.append(f'{key}: {value:.1f} (baseline {old:.1f})')
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark suite of State and search algorithms')
+    parser.add_argument('--save', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='compare with the results of this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown, default 0.25')
+    parser.add_argument('--repeat', type=int, default=6, help='repetitions of the micro benchmarks, half of it end to end')
+    parser.add_argument('--budget', type=int, default=5000, help='expansions per end to end search')
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat, args.budget)
+    for key, value in results.items():
+        print(f'{key:45} {value if value is None else round(value, 1)}')
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f'REGRESSION {message}')
+        if regressions:
+            sys.exit(1)
+        print('no regressions')
+
+
+if __name__ == "__main__":
+    main()
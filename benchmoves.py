@@ -0,0 +1,28 @@
+'''
+Benchmark of the move modes of State: single segment moves versus pourAll moves with pruning of useless moves
+
+The same seeded boards (full color tubes and really empty tubes) are searched in both modes with bfs and dfs;
+compare the reported total expansions, visited nodes and depth. Every mode is searched with State and with
+PartialOrderState, which skips commuting moves; compare the avg number of children and duplicates per expansion.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import random
+
+from WaterColorPuzzleAfg.game.state import State, PartialOrderState
+from WaterColorPuzzleAfg.search.bfsearch import bfs
+from WaterColorPuzzleAfg.search.dfsearch import dfs
+from WaterColorPuzzleAfg.search.instrument import Stats
+
+for (size, empty, colors) in [(4, 2, 4), (4, 2, 5), (4, 2, 6)]:
+    random.seed(size*100 + colors)
+    board = State.create(size, empty, colors, pourAll=True)
+    for pourAll in (False, True):
+        for cls in (State, PartialOrderState):
+            print(f'--- create({size},{empty},{colors}), pourAll={pourAll}, {cls.__name__}')
+            for search in (bfs, dfs):
+                stats = Stats(search.__name__, timing=False)
+                search(cls(*board.tubes, size=size, pourAll=pourAll), stats)
+                stats.report()
@@ -0,0 +1,55 @@
+'''
+Benchmark of the two State implementations: state.State (list of lists) and statepack.State (packed integers)
+
+Both classes run the same breadth first expansion on the same random board for a fixed number of expansions.
+Reported are the expanded nodes per second and the memory per visited state (tracemalloc).
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import random
+import time
+import tracemalloc
+from queue import SimpleQueue
+
+from WaterColorPuzzleAfg.game.state import State
+from WaterColorPuzzleAfg.game.statepack import State as PackedState
+
+def expand(start, limit):
+    '''
+    Breadth first expansion of at most limit nodes
+    @return: number of expansions and the set of visited nodes
+    '''
+    explored = SimpleQueue()
+    visited = set()
+    explored.put(start)
+    visited.add(start)
+    steps = 0
+    while not explored.empty() and steps < limit:
+        node = explored.get()
+        for child in node.children():
+            if not child in visited:
+                explored.put_nowait(child)
+                visited.add(child)
+        steps += 1
+    return steps, visited
+
+def bench(cls, tubes, size, limit):
+    start = cls(*tubes, size=size)
+    t0 = time.perf_counter()
+    steps, visited = expand(start, limit)
+    t1 = time.perf_counter()
+    tracemalloc.start()
+    steps, visited = expand(cls(*tubes, size=size), limit)
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'{cls.__module__:>35}: expansions={steps}, nodes/sec={steps/(t1-t0):10.0f}, '
+          f'visited={len(visited)}, bytes/state={mem/len(visited):6.0f}')
+
+for (size, empty, colors) in [(4, 2, 5), (4, 2, 12), (5, 2, 8)]:
+    random.seed(size*100 + colors)
+    tubes = [tuple(tube) for tube in State.create(size, empty, colors).tubes]
+    print(f'board create({size},{empty},{colors}) = {tubes}')
+    for cls in (State, PackedState):
+        bench(cls, tubes, size, 3000)
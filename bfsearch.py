@@ -10,34 +10,41 @@ Generic algorithm that works on any graph of nodes. The nodes must provide the f
 - node.parent:         the parent node of a node on the search path; only for backtracking
 
 Implementation using SimpleQueue as FIFO for active nodes.
+Counters and timing of a search are collected by passing an instrument.Stats object.
 
 Created on 17.10.2023
 @author: beh
 '''
 
 from queue import SimpleQueue
-import time
 
-def bfs(start):
+def bfs(start, stats=None):
     '''
     Start a breadth first search on the given node start.
     @param start: the node to start the search
+    @param stats: optional instrument.Stats to collect counters and timing of the search
     @return: the goal node if found, None else 
     '''
     explored = SimpleQueue() # FIFO queue for explored but not finished nodes; boarder of explored area
-    visited = set()          # SET of any seen nodes; node must define __eq__ and __hash__    
+    visited = set() if stats is None else stats.visitedSet() # SET of any seen nodes; node must define __eq__ and __hash__    
     explored.put(start)       
     visited.add(start)  
     
     while not explored.empty():
         node = explored.get()    
         if node.isGoal():
+            if stats is not None:
+                stats.finish(node)
             return node
-        for child in node.children():
+        for child in (node.children() if stats is None else stats.children(node)):
             if not child in visited:       
                 # child.parent = node
                 explored.put_nowait(child) 
                 visited.add(child)
+        if stats is not None:
+            stats.expanded(explored.qsize(), len(visited))
+    if stats is not None:
+        stats.finish(None)
     return None
 
 def backtrack(goal):
@@ -53,51 +60,12 @@ def backtrack(goal):
     return li
 
 
-
-def bfsVerbose(start):
-    '''
-    Version of bfs that collects some statistical data during search; for testing only
-    '''
-    start_time = time.time()
-    explored = SimpleQueue()  
-    visited = set()           
-    explored.put(start)       
-    visited.add(start)  
-    
-    steps, sumchild, sumnew, sumvis, sumexp = 0, 0, 0, 0, 0
-    while not explored.empty():
-        node = explored.get()    
-        if node.isGoal():
-            end_time = time.time()
-            print(f'bfs: start={str(start)}')         
-            print(f'bfs: running time={end_time - start_time} s, total expansions={steps}') 
-            print(f'bfs: avg number of child={sumchild/steps}, new={sumnew/steps}')
-            print(f'bfs: avg size of visited={sumvis/steps}, qsize={sumexp/steps}')
-            print(f'bfs: total child={sumchild}, visited={len(visited)}, last qsize={explored.qsize()}')        
-            print(f'bfs: goal={str(node)}, depth={node.depth}')         
-            return node
-        n,m = 0,0
-        for child in node.children():
-            n += 1
-            if not child in visited:       
-                # child.parent = node
-                m += 1
-                explored.put_nowait(child) 
-                visited.add(child)
-        sumchild += n
-        sumnew += m
-        sumvis += len(visited)
-        sumexp += explored.qsize()
-        steps += 1
-        # print(f'bfs: step={steps}, child={n}, new={m}, total={sumchild}, vis={len(visited)}, expsize={explored.qsize()}')
-    print(f'bfs: start={str(start)} search failed')         
-    return None
-
 # test code
 if __name__ == "__main__":
     # from statefix import State
     # from statevar import State
     from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.instrument import Stats
     import cProfile
     
     #start = State('BFDC','CB  ','DECE','BAB ','ACA ','DF  ','DEF ','AFE ')
@@ -107,7 +75,9 @@ if __name__ == "__main__":
     
     def f():
         print(f'start = {start}')
-        goal  = bfsVerbose(start)
+        stats = Stats('bfs')
+        goal  = bfs(start, stats)
+        stats.report()
         print(f'goal = {goal}')
         
     cProfile.run('f()')
@@ -0,0 +1,136 @@
+'''
+Bidirectional breadth first search algorithm
+
+Generic algorithm that works on any graph of nodes. Besides the operations needed by bfs the nodes must provide:
+
+- node.goals():         generator of goal nodes to start the backward search from
+- node.predecessors():  generator of all nodes from which node is reached by a single move; the parent of a 
+                        predecessor is node (the next node on the path to a goal)
+- node.depth:           number of moves from start (forward) or to the goal (backward)
+
+A forward search from start and a backward search from the goals expand layer by layer, always the direction whose
+next layer is cheaper: the size of its frontier times the number of nodes generated per expanded node in its last
+layer, since the reverse moves branch more than the forward moves. When both frontiers meet, the backward half is
+replayed forward with node.children(), so the returned goal has a complete parent chain back to start, as needed by
+backtrack(). Where the forward frontier grows exponentially every frontier grows only to about the square root of
+the size of a single breadth first search frontier; where the reachable space is small, bfs sees all of it anyway and
+is faster.
+Goals that are not generated by goals() are still found by the forward search (node.isGoal()).
+
+Created on 17.10.2026
+@author: beh
+'''
+
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+
+def bibfs(start, stats=None):
+    '''
+    Start a bidirectional breadth first search on the given node start.
+    @param start: the node to start the search
+    @param stats: optional instrument.Stats to collect counters and timing of the search; both directions count
+    @return: the goal node if found, None else 
+    '''
+    if start.isGoal():
+        if stats is not None:
+            stats.finish(start)
+        return start
+    forward = {start: start}    # DICT of nodes seen by the forward search; node -> node with parent chain to start
+    backward = {}               # DICT of nodes seen by the backward search; node -> node with parent chain to a goal
+    for goal in start.goals():
+        backward[goal] = goal
+    fLayer, bLayer = [start], list(backward)
+    fBranch = bBranch = 1   # generated nodes per expanded node within the last layer of each direction
+    
+    while fLayer:
+        meet = None
+        if bLayer and len(bLayer) * bBranch < len(fLayer) * fBranch:
+            layer, bLayer = bLayer, []
+            generated = 0
+            for node in layer:
+                for pred in (node.predecessors() if stats is None else stats.children(Reverse(node))):
+                    generated += 1
+                    if pred in backward:
+                        continue
+                    backward[pred] = pred
+                    bLayer.append(pred)
+                    if pred in forward:
+                        meet = better(meet, forward[pred], pred)
+                if stats is not None:
+                    stats.expanded(len(fLayer) + len(bLayer), len(forward) + len(backward))
+            bBranch = generated / len(layer)
+        else:
+            layer, fLayer = fLayer, []
+            generated = 0
+            for node in layer:
+                for child in (node.children() if stats is None else stats.children(node)):
+                    generated += 1
+                    if child in forward:
+                        continue
+                    forward[child] = child
+                    fLayer.append(child)
+                    if child in backward:
+                        meet = better(meet, child, backward[child])
+                    elif child.isGoal():
+                        meet = better(meet, child, None)
+                if stats is not None:
+                    stats.expanded(len(fLayer) + len(bLayer), len(forward) + len(backward))
+            fBranch = generated / len(layer)
+        if meet is not None:
+            goal = stitch(*meet)
+            if stats is not None:
+                stats.finish(goal)
+            return goal
+    if stats is not None:
+        stats.finish(None)
+    return None
+
+class Reverse(object):
+    '''
+    View of a node whose children are its predecessors; used to count the backward expansions by Stats
+    '''
+    def __init__(self, node):
+        self.node = node
+
+    def children(self):
+        return self.node.predecessors()
+
+def better(meet, node, back):
+    '''
+    Keep the meeting point (node, back) with the shorter total path
+    '''
+    depth = node.depth + (0 if back is None else back.depth)
+    if meet is None or depth < meet[0].depth + (0 if meet[1] is None else meet[1].depth):
+        return (node, back)
+    return meet
+
+def stitch(node, back):
+    '''
+    Replay the backward path from back to its goal starting at node, which is equal to back.
+    @return: the goal node with parent chain back to start
+    '''
+    while back is not None and back.parent is not None:
+        back = back.parent
+        node = next(child for child in node.children() if child == back)
+    return node
+
+
+# test code
+if __name__ == "__main__":
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.bfsearch import bfs
+    import random
+    import time
+
+    random.seed(1)
+    # a board with a large reachable space and few moves to a goal: the legacy goal of 8 colors, scrambled by 12
+    # reverse moves; bibfs expands about half the nodes of bfs. The pourAll board has a small reachable space and
+    # many goals, bfs is faster.
+    scrambled = State(*[c*4 for c in 'ABCDEFGH'], '', '', size=4)
+    for _ in range(12):
+        scrambled = random.choice(list(scrambled.predecessors()))
+    for start in (State(*scrambled.tubes, size=4), State.create(4, 2, 8, pourAll=True)):
+        print(f'start = {start}')
+        for search in (bfs, bibfs):
+            t = time.time()
+            goal = search(start)
+            print(f'{search.__name__}: time={time.time()-t:.3f} s, moves={len(backtrack(goal))-1}, goal={goal}')
@@ -0,0 +1,288 @@
+'''
+Compact binary format of boards of the color-sort-puzzle
+
+A single board and a batch of boards (a board corpus or a saved search frontier) have the same format, a single
+board is a batch of one record:
+
+- header (little endian): magic b'WSB', version, size (height of the tubes), number of tubes, flags (bit 0: pourAll),
+  number of colors, bits per segment, number of records (uint32) and the color symbols, one byte each
+- records of fixed width: the tubes in order, every tube has size segments (bottom first, most significant bits
+  first) of the color codes 1, 2, ... (index+1 into the symbols of the header), 0 is empty; the last byte is padded
+  with 0 bits
+
+A segment has 4 bits (a nibble) for up to 15 colors and grows to 5 or more bits for more colors, as in statepack.
+The round trip is exact: order and contents of the tubes, size, move mode and color symbols. A board of 10 tubes of
+height 4 takes 20 bytes per record. Colors must be single character symbols (latin-1), at most 255 of them; a tube
+must not be longer than size.
+
+Boards reads a batch from any buffer (bytes, mmap) through a memoryview without copying, a record is decoded into a
+State only when it is accessed. BoardFile opens a file memory-mapped, so even large corpora are opened in constant
+time and only the touched pages are read.
+
+Examples:
+data = dumps(state); state == loads(data)
+writeBoards('boards.wsb', (State.create(4, 2, 8, pourAll=True) for _ in range(100000)))
+with BoardFile('boards.wsb') as boards: print(len(boards), boards[42])
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import mmap
+import os
+import struct
+
+from WaterColorPuzzleAfg.game.state import State
+
+Magic = b'WSB'
+Version = 1
+Header = struct.Struct('<3sBBBBBBI')   # magic, version, size, tubes, flags, colors, bits, records
+PourAll = 1   # flag of the move mode
+
+def segmentBits(colors):
+    '''
+    Number of bits of a segment for the codes 0 (empty) and 1..colors: at least a nibble
+    '''
+    return max(4, colors.bit_length())
+
+def recordWidth(size, tubes, bits):
+    '''
+    Number of bytes of a record: bits per segment position
+    '''
+    return (size * tubes * bits + 7) // 8
+
+def header(size, tubes, pourAll, symbols, count):
+    '''
+    Bytes of the header of a batch
+    @raise ValueError: if the colors can not be encoded
+    '''
+    if len(symbols) > 255:
+        raise ValueError(f'{len(symbols)} colors, at most 255 colors can be encoded')
+    if not 0 < size <= 255 or not 2 <= tubes <= 255:
+        raise ValueError(f'size {size} and {tubes} tubes can not be encoded, both must be at most 255')
+    if count >= 1 << 32:
+        raise ValueError(f'{count} boards, at most {(1 << 32) - 1} boards can be encoded in a batch')
+    if any(not isinstance(s, str) or len(s) != 1 or ord(s) > 255 for s in symbols):
+        raise ValueError('colors must be single character symbols')
+    return Header.pack(Magic, Version, size, tubes, PourAll if pourAll else 0, len(symbols),
+                       segmentBits(len(symbols)), count) + ''.join(symbols).encode('latin-1')
+
+def packRecord(state, size, codes, bits, width):
+    '''
+    Pack the tubes of state into a record of width bytes with bits per segment
+    @param codes: code of every color symbol
+    @raise ValueError: if a tube is longer than size
+    '''
+    value = 0
+    for tube in state.tubes:
+        if len(tube) > size:
+            raise ValueError(f'tube {list(tube)} longer than size {size}')
+        for color in tube:
+            value = value << bits | codes[color]
+        value <<= bits * (size - len(tube))
+    return (value << (8*width - bits*size*len(state.tubes))).to_bytes(width, 'big')
+
+def dumps(state):
+    '''
+    Compact binary encoding of a single board
+    @return: bytes object; restore the board with loads()
+    '''
+    return dumpBatch([state])
+
+def loads(data, cls=State):
+    '''
+    Board of the bytes of dumps()
+    @param cls: class of the new state, State or a subclass
+    @return: a new state without parent
+    '''
+    return Boards(data, cls)[0]
+
+def dumpBatch(states):
+    '''
+    Compact binary encoding of a batch of boards with equal size, number of tubes and move mode
+    @return: bytes object; read the boards with Boards
+    @raise ValueError: if the boards do not fit together or can not be encoded
+    '''
+    states = list(states)
+    data = bytearray()
+    for chunk in chunks(states):
+        data += chunk
+    return bytes(data)
+
+def writeBoards(filename, states):
+    '''
+    Write a batch of boards to a file, see dumpBatch(); the file appears only when complete
+    @return: number of boards
+    @raise ValueError: if the boards do not fit together or can not be encoded; no file is left behind
+    '''
+    states = list(states)
+    try:
+        with open(filename + '.tmp', 'wb') as f:
+            for chunk in chunks(states):
+                f.write(chunk)
+    except BaseException:
+        os.remove(filename + '.tmp')
+        raise
+    os.replace(filename + '.tmp', filename)
+    return len(states)
+
+def chunks(states):
+    '''
+    Generator of the header and the packed records of a list of states
+    @raise ValueError: if the list is empty or a state does not have the size, number of tubes and move mode of the
+                       first one
+    '''
+    if not states:
+        raise ValueError('no boards')
+    first = states[0]
+    symbols = sorted({color for state in states for color in state.symbols})
+    yield header(first.size, first.tubeCount(), first.pourAll, symbols, len(states))
+    codes = {color: n+1 for n, color in enumerate(symbols)}
+    bits = segmentBits(len(symbols))
+    width = recordWidth(first.size, first.tubeCount(), bits)
+    for state in states:
+        if (state.size, state.tubeCount(), state.pourAll) != (first.size, first.tubeCount(), first.pourAll):
+            raise ValueError(f'board {state} does not fit to the batch')
+        yield packRecord(state, first.size, codes, bits, width)
+
+class Boards(object):
+    '''
+    Read only sequence of the boards of a batch within a buffer; the buffer is not copied, every record is decoded
+    on access
+    @ivar size: maximum number of color segments within a tube
+    @ivar tubes: number of tubes of every board
+    @ivar pourAll: move mode of the boards
+    @ivar symbols: color symbols, symbols[code-1]
+    @ivar bits: number of bits of a segment
+    @ivar width: number of bytes of a record
+    '''
+    def __init__(self, buffer, cls=State):
+        '''
+        @param buffer: bytes, bytearray, mmap or any other object supporting the buffer protocol
+        @param cls: class of the decoded states, State or a subclass
+        @raise ValueError: if the buffer does not hold a batch of boards
+        '''
+        self.buffer = memoryview(buffer)
+        if len(self.buffer) < Header.size:
+            raise ValueError('buffer too short for a batch of boards')
+        magic, version, self.size, self.tubes, flags, colors, self.bits, self.count = Header.unpack_from(self.buffer)
+        if magic != Magic or version != Version:
+            raise ValueError('buffer does not hold a batch of boards')
+        if self.bits < colors.bit_length():
+            raise ValueError(f'{self.bits} bits per segment can not hold {colors} colors')
+        self.pourAll = bool(flags & PourAll)
+        self.symbols = tuple(bytes(self.buffer[Header.size:Header.size+colors]).decode('latin-1'))
+        self.offset = Header.size + colors
+        self.width = recordWidth(self.size, self.tubes, self.bits)
+        if len(self.buffer) < self.offset + self.count*self.width:
+            raise ValueError('buffer too short for the records of the header')
+        self.cls = cls
+
+    def __len__(self):
+        return self.count
+
+    def record(self, n):
+        '''
+        Record n as bytes, e.g. as compact key; a copy, so it stays valid after close()
+        '''
+        with self.view(n) as view:
+            return bytes(view)
+
+    def view(self, n):
+        '''
+        Record n as memoryview into the buffer; release it (or use it as context manager) before close()
+        '''
+        if not -self.count <= n < self.count:
+            raise IndexError('board index out of range')
+        pos = self.offset + (n % self.count) * self.width
+        return self.buffer[pos:pos+self.width]
+
+    def __getitem__(self, n):
+        '''
+        Board n decoded as a new state without parent
+        '''
+        symbols, size, bits = self.symbols, self.size, self.bits
+        segments = size * self.tubes
+        with self.view(n) as view:
+            value = int.from_bytes(view, 'big') >> (8*self.width - bits*segments)
+        mask = (1 << bits) - 1
+        codes = [(value >> (bits * (segments-1-k))) & mask for k in range(segments)]
+        tubes = [[symbols[code-1] for code in codes[k:k+size] if code] for k in range(0, segments, size)]
+        return self.cls(*tubes, size=size, pourAll=self.pourAll)
+
+    def __iter__(self):
+        for n in range(self.count):
+            yield self[n]
+
+    def release(self):
+        '''
+        Release the memoryview of the buffer
+        '''
+        self.buffer.release()
+
+class BoardFile(Boards):
+    '''
+    Boards of a file written by writeBoards(), memory-mapped read only; use it as context manager or call close().
+    close() raises BufferError while a memoryview of view() is alive; record() returns bytes and is always safe.
+    '''
+    def __init__(self, filename, cls=State):
+        with open(filename, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        super().__init__(self.map, cls)
+
+    def close(self):
+        self.release()
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+# test code
+if __name__ == "__main__":
+    import pickle
+    import random
+    import tempfile
+    import time
+
+    random.seed(7)
+    for start in (State.create(4, 2, 8, pourAll=True), State.create(4, 2, 5), State('BFDC', 'CB', 'DECE', 'BA', '', size=4),
+                  State.create(6, 2, 16, pourAll=True), State.create(4, 2, 15)):
+        data = dumps(start)
+        board = loads(data)
+        print(f'{start}: {len(data)} bytes, pickle {len(pickle.dumps(start))} bytes, '
+              f'round trip={board.tubes == start.tubes and board.size == start.size and board.pourAll == start.pourAll}')
+
+    states = [State.create(4, 2, 12, pourAll=True) for _ in range(100000)]
+    filename = os.path.join(tempfile.mkdtemp(), 'boards.wsb')
+    t = time.perf_counter()
+    writeBoards(filename, states)
+    print(f'write: {len(states)} boards, {os.path.getsize(filename)} bytes, {time.perf_counter()-t:.3f} s')
+    t = time.perf_counter()
+    data = pickle.dumps(states)
+    print(f'pickle: {len(data)} bytes, {time.perf_counter()-t:.3f} s')
+    t = time.perf_counter()
+    pickle.loads(data)
+    print(f'unpickle: {time.perf_counter()-t:.3f} s')
+    t = time.perf_counter()
+    with BoardFile(filename) as boards:
+        n, board = len(boards), boards[-1]
+        print(f'open and read last board: {time.perf_counter()-t:.6f} s, boards={n}, equal={board == states[-1]}')
+        t = time.perf_counter()
+        same = all(board.tubes == state.tubes for board, state in zip(boards, states))
+        print(f'decode all: {time.perf_counter()-t:.3f} s, round trip={same}')
+        key = boards.record(0)
+    print(f'record after close: {len(key)} bytes')
+    # a board of another size fails the batch, no file is left behind
+    try:
+        writeBoards(filename, [states[0], State.create(5, 2, 12, pourAll=True)])
+    except ValueError as e:
+        print(f'ValueError: {e}, temporary file left: {os.path.exists(filename + ".tmp")}')
+    try:
+        dumps(State.create(4, 254, 2))
+    except ValueError as e:
+        print(f'ValueError: {e}')
+    os.remove(filename)
@@ -0,0 +1,189 @@
+'''
+Unsolvability detection and dead-end pruning for the color-sort-puzzle
+
+A dead end is a state from which no goal state is reachable. The canonical keys of known dead ends are collected
+in a DeadEnds table that is shared by all searches of a process; the height of the tubes and the move mode are part
+of the stored key, so boards of different configurations never share an entry. The table holds at most maxSize keys,
+the least recently used ones are evicted, so long running processes (batchsolve, solveservice) stay bounded:
+
+- unsolvable(state):  pre-check of a board before a search, returns the reason or None; it detects tubes over
+                      capacity, more colors than tubes can hold, boards without a legal move, known dead ends and
+                      boards whose whole reachable space is exhausted by a small search without a goal (refute)
+- DeadEndState:       State whose children() drops the children found in the table and adds a state to the table
+                      if none of its children is left; so hopeless subtrees are cut during the search and
+                      repeated searches learn more and more dead ends
+
+Every rule is exact with respect to the moves of children(), no solvable state is ever reported or pruned.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+from itertools import islice
+
+from WaterColorPuzzleAfg.game.state import State
+
+class DeadEnds(object):
+    '''
+    Bounded table of the canonical keys of states without a path to a goal
+    @ivar keys: dict of the keys (size, pourAll, canonical key) in order of their last use, values are None
+    @ivar maxSize: maximum number of keys; if the table is full, a quarter of the keys is evicted, the least recently
+                   used ones first
+    @ivar hits: number of successful lookups
+    @ivar evictions: number of evicted keys
+    '''
+    def __init__(self, maxSize=1000000):
+        self.keys = {}
+        self.maxSize = maxSize
+        self.hits = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, state):
+        key = keyOf(state)
+        if self.keys.pop(key, False) is None:
+            self.keys[key] = None   # most recently used
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, state):
+        self.update((state,))
+
+    def update(self, states):
+        keys = self.keys
+        for state in states:
+            key = keyOf(state)
+            keys.pop(key, None)
+            if len(keys) >= self.maxSize:
+                self.evict()
+            keys[key] = None
+
+    def evict(self):
+        '''
+        Remove a quarter of the keys, the least recently used ones
+        '''
+        n = max(1, self.maxSize // 4)
+        for key in list(islice(self.keys, n)):
+            del self.keys[key]
+        self.evictions += n
+
+def keyOf(state):
+    '''
+    Key of state within the table: a dead end of one height or move mode may be solvable in another one
+    '''
+    return state.size, state.pourAll, state.key
+
+# table shared by unsolvable() and DeadEndState
+deadEnds = DeadEnds()
+
+def refute(start, limit=1000, table=deadEnds):
+    '''
+    Search the reachable space of start completely, if it has at most limit states. If no goal is found, all
+    reachable states are dead ends and added to table.
+    @return: True if start is proven unsolvable, False if a goal was found or the limit was reached
+    '''
+    frontier = [start]
+    visited = {start}
+    while frontier:
+        node = frontier.pop()
+        if node.isGoal():
+            return False
+        for child in node.children():
+            if not child in visited:
+                if len(visited) >= limit:
+                    return False
+                visited.add(child)
+                frontier.append(child)
+    table.update(visited)
+    return True
+
+def unsolvable(state, limit=1000, table=deadEnds):
+    '''
+    Fast pre-check of a board
+    @param limit: maximal number of states searched by refute(), 0 to skip this check
+    @return: the reason as string if the board is unsolvable, None if no reason was found
+    '''
+    counts = {}
+    for tube in state.tubes:
+        for color in tube:
+            counts[color] = counts.get(color, 0) + 1
+    if state.pourAll:
+        if any(len(tube) > state.size for tube in state.tubes):
+            return 'tube over capacity'
+        # every color needs at least count/size tubes of the goal
+        if sum(-(-n // state.size) for n in counts.values()) > state.tubeCount():
+            return 'more colors than tubes can hold'
+    elif len(counts) > state.tubeCount():
+        return 'more colors than tubes'
+    if state.isGoal():
+        return None
+    if next(iter(state.children()), None) is None:
+        table.add(state)
+        return 'no legal move'
+    if state in table:
+        return 'known dead end'
+    if limit and refute(state, limit, table):
+        return 'reachable space exhausted'
+    return None
+
+class DeadEndState(State):
+    '''
+    State that prunes the dead ends of the table from its children. If no child is left, the state itself is a
+    dead end and added to the table. The table is a class attribute.
+    '''
+    deadEnds = deadEnds
+
+    def children(self):
+        table = DeadEndState.deadEnds
+        alive = False
+        for child in State.children(self):
+            if not child in table:
+                alive = True
+                yield child
+        if not alive and not self.isGoal():
+            table.add(self)
+
+
+# test code
+if __name__ == "__main__":
+    import random
+    import time
+    from WaterColorPuzzleAfg.search.bfsearch import bfs
+    from WaterColorPuzzleAfg.search.instrument import Stats
+
+    # the "no goal" board of testsearch.py
+    tubes = [[chr(ord('@') + int(c, 16)) for c in f'{t:x}'] for t in (0xb24 ,0x316 ,0x8243, 0x17c9, 0x359, 0xc867,
+             0x91, 0x58, 0x71bb, 0x2643, 0x6a4c, 0x95b, 0x8c5a, 0xa2a7)]
+    t = time.perf_counter()
+    print(f'no goal board: {unsolvable(State(*tubes, size=4, pourAll=True))}, {time.perf_counter()-t:.4f} s')
+    print(f'too many colors: {unsolvable(State("AAB", "BBA", "CCC", "CD", size=3, pourAll=True))}')
+    # a dead end of height 3 is solvable with height 4 and in legacy mode
+    tubes = ('BCA', 'ACB', 'BCA', '')
+    print(f'height 3: {unsolvable(State(*tubes, size=3, pourAll=True))}, '
+          f'height 4: {unsolvable(State(*tubes, size=4, pourAll=True))}, legacy: {unsolvable(State(*tubes, size=3))}')
+
+    # random boards: pre-check, then bfs with and without pruning; the table learns from every search
+    random.seed(4)
+    boards = [State.create(4, 1, 6, pourAll=True).tubes for _ in range(20)]
+    for cls in (State, DeadEndState):
+        deadEnds.keys.clear()
+        t = time.perf_counter()
+        expansions = rejected = 0
+        for tubes in boards:
+            start = cls(*tubes, size=4, pourAll=True)
+            if cls is DeadEndState and unsolvable(start):
+                rejected += 1
+                continue
+            stats = Stats(timing=False)
+            bfs(start, stats)
+            expansions += stats.expansions
+        print(f'{cls.__name__:>12}: time={time.perf_counter()-t:.3f} s, expansions={expansions}, '
+              f'rejected={rejected}, dead ends={len(deadEnds)}, hits={deadEnds.hits}')
+
+    # a small table stays bounded, the least recently used dead ends are evicted
+    table = DeadEnds(maxSize=100)
+    rejected = sum(bool(unsolvable(State(*tubes, size=4, pourAll=True), table=table)) for tubes in boards)
+    print(f'bounded table: rejected={rejected}, size={len(table)}, evictions={table.evictions}')
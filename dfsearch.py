@@ -9,21 +9,21 @@ Generic algorithm that works on any graph of nodes. The nodes must provide the f
 - node.parent: the parent node of a node on the search path
 
 Non recursive implementation using built-in list as stack of active nodes.
+Counters and timing of a search are collected by passing an instrument.Stats object.
 
 Created on 17.10.2023
 @author: beh
 '''
 
-import time
-
-def dfs(start):
+def dfs(start, stats=None):
     '''
     Start a depth first search on the given node start.
     @param start: the node to start the search
+    @param stats: optional instrument.Stats to collect counters and timing of the search
     @return: the goal node if found, None else 
     '''
     stack = list()
-    visited = set()
+    visited = set() if stats is None else stats.visitedSet()
     stack.append(start)
     
     while len(stack) != 0:
@@ -31,55 +31,17 @@ def dfs(start):
         if not node in visited:
             visited.add(node)
             if node.isGoal():
+                if stats is not None:
+                    stats.finish(node)
                 return node
-            for child in node.children():
+            for child in (node.children() if stats is None else stats.children(node)):
                 stack.append(child)
-        
+            if stats is not None:
+                stats.expanded(len(stack), len(visited))
+    if stats is not None:
+        stats.finish(None)
     return None
 
-def dfsVerbose(start):
-    '''
-    Start a depth first search on the given node start.
-    @param start: the node to start the search
-    @return: the goal node if found, None else 
-    '''
-    start_time = time.time()
-    stack = list()
-    visited = set()
-    stack.append(start)
-    steps, sumchild, sumnew, sumvis, sumstack = 0, 0, 0, 0, 0
-
-    goal = None
-    while len(stack) != 0:
-        steps = steps+1
-        sumstack = sumstack+len(stack)
-        node = stack.pop()
-        sumvis=sumvis+1
-        if not node in visited:
-            visited.add(node)
-            sumnew = sumnew+1
-            if node.isGoal():
-                goal = node
-                break
-            for child in node.children():
-                sumchild = sumchild+1
-                stack.append(child)
-        
-    end_time = time.time()
-    print(f'bfs: start={str(start)}')         
-    print(f'bfs: running time={end_time - start_time} s, total expansions={steps}') 
-    print(f'bfs: avg number of child={sumchild/steps}, new={sumnew/steps}')
-    print(f'bfs: avg size of visited={sumvis/steps}, stacksize={sumstack/steps}')
-    print(f'bfs: total child={sumchild}, visited={len(visited)}, last stacksize={len(stack)}')        
-    print(f'bfs: goal={str(goal)}, depth={node.depth}')         
-    return goal
-
-
-
-
-
-
-
 def backtrack(goal):
     '''
     Backtrack the search tree path from goal to start 
@@ -99,6 +61,7 @@ if __name__ == "__main__":
     # from statefix import State
     # from statevar import State
     from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.instrument import Stats
     import cProfile
     
     # start = State('BFDC','CB  ','DECE','BAB ','ACA ','DF  ','DEF ','AFE ')
@@ -109,7 +72,9 @@ if __name__ == "__main__":
     
     print(f'start = {start}')
     def f():
-        goal  = dfs(start)
+        stats = Stats('dfs')
+        goal  = dfs(start, stats)
+        stats.report()
         print(f'goal = {goal}')
     
     # f()
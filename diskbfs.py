@@ -0,0 +1,245 @@
+'''
+External memory breadth first search algorithm
+
+Breadth first search for puzzles whose state space exceeds the main memory. The nodes must provide the operations
+needed by leansearch (isGoal, children, encode, decode). Every depth layer is stored on disk as a file of records
+sorted by canonical key; a record is the fixed width key followed by the rank (uint32) of the parent's record within
+the previous layer, that is the parent index used to rebuild the solution.
+
+Expansion of layer d writes the children in sorted runs of at most bufferSize records. The runs are merged, 
+duplicates are removed and the keys of all former layers are subtracted by merging against their sorted files
+(delayed duplicate detection); the result is layer d+1. Only the run buffer and one block of BlockBytes per open
+file are in main memory, so the memory of the merge grows only by 64 KB per run and former layer.
+
+A manifest file is written atomically after every finished layer, so an interrupted search resumes with the next
+layer when it is started again with the same start node and directory. 
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import heapq
+import json
+import os
+import resource
+import sys
+
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+from WaterColorPuzzleAfg.search.leansearch import replay
+
+NoParent = 0xFFFFFFFF
+BlockBytes = 1 << 16   # bytes per read and write block of a file
+
+def diskBfs(start, directory, bufferSize=1 << 20, verbose=True):
+    '''
+    Start an external memory breadth first search on the given node start.
+    @param start: the node to start the search
+    @param directory: directory of the layer files and the manifest; an existing search is resumed
+    @param bufferSize: maximum number of child records sorted in main memory
+    @param verbose: print the statistics of every layer
+    @return: the goal node if found, None else 
+    '''
+    os.makedirs(directory, exist_ok=True)
+    key = start.encode(canonical=True)
+    disk = LayerStore(directory, len(key))
+    manifest = disk.load()
+    if manifest is None or manifest['start'] != start.encode().hex():
+        disk.clear()
+        disk.write(0, [(key, NoParent)])
+        manifest = {'start': start.encode().hex(), 'width': len(key), 'goal': None, 
+                    'layers': [{'states': 1, 'written': disk.written, 'read': 0, 'peakRAM': peakRAM()}]}
+        if start.isGoal():
+            manifest['goal'] = 0
+        disk.save(manifest)
+        
+    while manifest['goal'] is None and manifest['layers'][-1]['states'] > 0:
+        d = len(manifest['layers']) - 1
+        disk.written = disk.read = 0
+        runs = expand(start, disk, d, bufferSize)
+        states, goal = disk.merge(d+1, runs, start)
+        for run in runs:
+            os.remove(run)
+        manifest['layers'].append({'states': states, 'written': disk.written, 'read': disk.read, 'peakRAM': peakRAM()})
+        if goal is not None:
+            manifest['goal'] = goal
+        disk.save(manifest)
+        if verbose:
+            print(f'diskbfs: layer={d+1}, states={states}, written={disk.written} B, read={disk.read} B, '
+                  f'peak RAM={peakRAM()} KB')
+    
+    if manifest['goal'] is None:
+        return None
+    return replay(start, disk.path(len(manifest['layers'])-1, manifest['goal']))
+
+def expand(start, disk, d, bufferSize):
+    '''
+    Expand all nodes of layer d, write the children as sorted runs 
+    @return: list of run file names
+    '''
+    runs, buffer = [], []
+    for rank, (key, _) in enumerate(disk.records(disk.layerName(d))):
+        for child in start.decode(key).children():
+            buffer.append((child.encode(canonical=True), rank))
+        if len(buffer) >= bufferSize:
+            runs.append(disk.writeRun(len(runs), buffer))
+            buffer = []
+    if buffer:
+        runs.append(disk.writeRun(len(runs), buffer))
+    return runs
+
+def peakRAM():
+    '''
+    Peak resident memory of this process in KB
+    '''
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss   # bytes on macOS, KB on Linux
+
+
+class LayerStore(object):
+    '''
+    Files of sorted records (key, parent rank) in a directory; counts the bytes written and read
+    '''
+    def __init__(self, directory, width):
+        self.directory = directory
+        self.width = width
+        self.written = 0
+        self.read = 0
+
+    def layerName(self, d):
+        return os.path.join(self.directory, f'layer_{d:04d}.dat')
+
+    def load(self):
+        try:
+            with open(os.path.join(self.directory, 'manifest.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, manifest):
+        name = os.path.join(self.directory, 'manifest.json')
+        with open(name + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(name + '.tmp', name)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.startswith(('layer_', 'run_', 'manifest')):
+                os.remove(os.path.join(self.directory, name))
+
+    def write(self, d, records):
+        '''
+        Write the sorted records as layer d; the file appears only when complete
+        @return: number of records
+        '''
+        name = self.layerName(d)
+        n = self._write(name + '.tmp', records)
+        os.replace(name + '.tmp', name)
+        return n
+
+    def writeRun(self, n, buffer):
+        '''
+        Sort the buffer, remove duplicate keys and write it as run n
+        @return: name of the run file
+        '''
+        buffer.sort()
+        name = os.path.join(self.directory, f'run_{n:04d}.dat')
+        self._write(name, unique(buffer))
+        return name
+
+    def _write(self, name, records):
+        n = 0
+        with open(name, 'wb') as f:
+            block = bytearray()
+            for key, parent in records:
+                block += key
+                block += parent.to_bytes(4, 'little')
+                n += 1
+                if len(block) >= BlockBytes:
+                    f.write(block)
+                    self.written += len(block)
+                    block = bytearray()
+            f.write(block)
+            self.written += len(block)
+        return n
+
+    def records(self, name):
+        '''
+        Generator of all records (key, parent rank) of a file
+        '''
+        w, size = self.width, self.width+4
+        blockSize = max(1, BlockBytes // size) * size   # whole records
+        with open(name, 'rb') as f:
+            while True:
+                block = f.read(blockSize)
+                if not block:
+                    return
+                self.read += len(block)
+                for pos in range(0, len(block), size):
+                    yield block[pos:pos+w], int.from_bytes(block[pos+w:pos+size], 'little')
+
+    def merge(self, d, runs, start):
+        '''
+        Merge the runs into layer d, without duplicates and without the keys of all former layers
+        @return: number of records of layer d and rank of the first goal within layer d (or None)
+        '''
+        fresh = unique(heapq.merge(*[self.records(run) for run in runs]))
+        former = heapq.merge(*[(key for key, _ in self.records(self.layerName(k))) for k in range(d)])
+        goal = None
+        def subtract():
+            nonlocal goal
+            old = next(former, None)
+            rank = 0
+            for key, parent in fresh:
+                while old is not None and old < key:
+                    old = next(former, None)
+                if old == key:
+                    continue
+                if goal is None and start.decode(key).isGoal():
+                    goal = rank
+                rank += 1
+                yield key, parent
+        states = self.write(d, subtract())
+        return states, goal
+
+    def path(self, d, rank):
+        '''
+        Return the list of keys from start to the record with the given rank in layer d
+        '''
+        size = self.width + 4
+        li = []
+        while d >= 0:
+            with open(self.layerName(d), 'rb') as f:
+                f.seek(rank*size)
+                record = f.read(size)
+            li.append(record[:self.width])
+            rank = int.from_bytes(record[self.width:], 'little')
+            d -= 1
+        li.reverse()
+        return li
+
+def unique(records):
+    '''
+    Generator of the sorted records without duplicate keys; the first record of a key is kept
+    '''
+    last = None
+    for key, parent in records:
+        if key != last:
+            last = key
+            yield key, parent
+
+
+# test code
+if __name__ == "__main__":
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.bfsearch import bfs
+    import random
+    import tempfile
+
+    random.seed(3)
+    start = State.create(4, 2, 10, pourAll=True)
+    print(f'start = {start}')
+    with tempfile.TemporaryDirectory() as directory:
+        goal = diskBfs(start, directory, bufferSize=10000)
+        print(f'diskbfs: moves={len(backtrack(goal))-1}, bfs: moves={len(backtrack(bfs(start)))-1}')
+        goal = diskBfs(start, directory)
+        print(f'diskbfs resumed: moves={len(backtrack(goal))-1}')
@@ -12,24 +12,25 @@ Created on 20.10.2023
 '''
 
 import tkinter as tk
+from itertools import zip_longest
+
+from WaterColorPuzzleAfg.view import displaystyle as style
 
 class WaterSortCanvas(tk.Canvas):
     '''
     Canvas to display the water-sort-puzzle
     '''
-    # geometric sizes in pixel
-    Width  = 40  # width of tube
-    Height = 30  # height of color segment
-    Gap    = 20  # gap between tubes
-    Top    = 60  # padding top, keep some space for arrow 
-    Left   = 20  # padding left
-    Right  = 20  # padding right
-    Bottom = 20  # padding bottom
-    # color definitions
-    backgroundColor = "black"   # is also empty color
-    lineColor       = "beige"    
-    waterColors     = ["DeepPink", "DarkOrange", "yellow2", "BlueViolet", "aquamarine", "DarkRed", "CadetBlue", "YellowGreen", 
-                       "chocolate", "DarkGrey", "dark magenta", "DarkCyan", "DarkOliveGreen", "SpringGreen", "DeepSkyBlue", "ForestGreen"]
+    # geometric sizes in pixel and color definitions, see displaystyle
+    Width  = style.Width
+    Height = style.Height
+    Gap    = style.Gap
+    Top    = style.Top
+    Left   = style.Left
+    Right  = style.Right
+    Bottom = style.Bottom
+    backgroundColor = style.backgroundColor
+    lineColor       = style.lineColor
+    waterColors     = style.waterColors
     
     def __init__(self, master, **kwargs):
         '''
@@ -38,6 +39,9 @@ class WaterSortCanvas(tk.Canvas):
         super().__init__(master, **kwargs)
         self.configure(background=WaterSortCanvas.backgroundColor)
         self.colorMap = {}
+        self.items = []       # canvas item ids of the color segments: items[i][j] for tube i, position j
+        self.symbols = []     # displayed symbol of every color segment, same layout as items
+        self.animation = None # running animation: tuple of after-job, state and action
         
     def initialize(self, state):
         '''
@@ -49,7 +53,10 @@ class WaterSortCanvas(tk.Canvas):
         actualize the display.
         @param state: abstract game state, where symbols represent the waterColors 
         '''
+        self.stopAnimation()
         self.delete("all")
+        self.items = []
+        self.symbols = []
         bg = self["background"]
         self.colorMap = {None:bg}
         m = state.tubeCount()
@@ -66,6 +73,8 @@ class WaterSortCanvas(tk.Canvas):
         '''
         n = state.tubeSize()
         y = yo + n*height
+        items = []
+        symbols = []
         for j in range(n):
             y -= height
             c = state.get(i, j)
@@ -73,24 +82,77 @@ class WaterSortCanvas(tk.Canvas):
                 self.colorMap[c] = WaterSortCanvas.waterColors[(len(self.colorMap)-3) % len(WaterSortCanvas.waterColors)]
             col = self.colorMap[c]
             if j == 0:
-                self.create_arc(x, y-height, x+width, y+height, start=180, extent=180, style="pieslice", fill=col, outline=col, width=1, tags=('all',f'tube_{i}',f'rec_{i},{j}'))            
+                item = self.create_arc(x, y-height, x+width, y+height, start=180, extent=180, style="pieslice", fill=col, outline=col, width=1, tags=('all',f'tube_{i}',f'rec_{i},{j}'))            
             else:         
-                self.create_rectangle(x, y, x+width, y+height, fill=col, outline=col, width=1, tags=('all',f'tube_{i}',f'rec_{i},{j}'))
+                item = self.create_rectangle(x, y, x+width, y+height, fill=col, outline=col, width=1, tags=('all',f'tube_{i}',f'rec_{i},{j}'))
+            items.append(item)
+            symbols.append(c)
+        self.items.append(items)
+        self.symbols.append(symbols)
         col = WaterSortCanvas.lineColor
         yu  = yo+(n-1)*height    
         self.create_line(x,       yo-5, x,       yu, width=3, fill=col, tags=('all',f'tube_{i}'))
         self.create_line(x+width, yo-5, x+width, yu, width=3, fill=col, tags=('all',f'tube_{i}'))
         self.create_arc (x, yu-height, x+width, yu+height, start=180, extent=180, style="arc", fill=None, outline=col, width=3, tags=('all',f'tube_{i}'))
            
-    def update(self, state):
+    def update(self, state, action=None):
         '''
         Update the color distribution after a state change due to filling a color into an other tube. 
+        Only the segments whose symbol differs from the displayed one are redrawn; a running animation is finished.
         @param state: abstract game state, where symbols represent the waterColors         
+        @param action: optional move (fr, to) from the displayed state to state, then only these two tubes are compared
+        '''
+        self.stopAnimation()
+        for i in range(len(self.items)) if action is None else action:
+            for j in range(len(self.items[i])):
+                self.setSegment(i, j, state.get(i, j))
+
+    def animate(self, state, action, delay=80):
+        '''
+        Show the move action from the displayed state to state as animated pour: the changed segments leave tube fr
+        from the top and fill tube to from the bottom, one segment every delay milliseconds. 
+        A running animation is finished first; update() and initialize() finish or stop an animation.
+        @param state: abstract game state after the move
+        @param action: the move (fr, to)
+        @param delay: milliseconds between two segments
+        '''
+        self.stopAnimation()
+        fr, to = action
+        out  = [(fr, j) for j in reversed(range(len(self.items[fr]))) if self.symbols[fr][j] != state.get(fr, j)]
+        into = [(to, j) for j in range(len(self.items[to])) if self.symbols[to][j] != state.get(to, j)]
+        self.animateStep(state, action, list(zip_longest(out, into)), delay)
+
+    def animateStep(self, state, action, steps, delay):
+        '''
+        Internal operation to show the next step of an animation, steps is a list of pairs of segments (i, j) or None
+        '''
+        if not steps:
+            self.animation = None
+            return
+        for segment in steps[0]:
+            if segment is not None:
+                self.setSegment(*segment, state.get(*segment))
+        job = self.after(delay, self.animateStep, state, action, steps[1:], delay)
+        self.animation = (job, state, action)
+
+    def stopAnimation(self):
+        '''
+        Internal operation to finish a running animation by showing its final state immediately
+        '''
+        if self.animation is not None:
+            job, state, action = self.animation
+            self.animation = None
+            self.after_cancel(job)
+            self.update(state, action)
+
+    def setSegment(self, i, j, symbol):
+        '''
+        Internal operation to show symbol at tube i and position j, the canvas item is changed only if necessary
         '''
-        for i in range(state.tubeCount()):
-            for j in range(state.tubeSize()):
-                col = self.colorMap[state.get(i,j)]
-                self.itemconfig(f'rec_{i},{j}', fill=col, outline=col)
+        if self.symbols[i][j] != symbol:
+            self.symbols[i][j] = symbol
+            col = self.colorMap[symbol]
+            self.itemconfig(self.items[i][j], fill=col, outline=col)
                 
     def show(self, fr, to):
         '''
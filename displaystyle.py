@@ -0,0 +1,23 @@
+'''
+Geometry and colors of the display of the water-sort-puzzle
+
+Shared by the Tk canvas (display.WaterSortCanvas) and the headless export (replayexport), so both draw the same
+picture; this module does not import tkinter.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+# geometric sizes in pixel
+Width  = 40  # width of tube
+Height = 30  # height of color segment
+Gap    = 20  # gap between tubes
+Top    = 60  # padding top, keep some space for arrow 
+Left   = 20  # padding left
+Right  = 20  # padding right
+Bottom = 20  # padding bottom
+# color definitions
+backgroundColor = "black"   # is also empty color
+lineColor       = "beige"    
+waterColors     = ["DeepPink", "DarkOrange", "yellow2", "BlueViolet", "aquamarine", "DarkRed", "CadetBlue", "YellowGreen", 
+                   "chocolate", "DarkGrey", "dark magenta", "DarkCyan", "DarkOliveGreen", "SpringGreen", "DeepSkyBlue", "ForestGreen"]
@@ -0,0 +1,258 @@
+'''
+Endgame database of the color-sort-puzzle
+
+Most of the search time is spent in the last moves, where the boards are nearly sorted. An endgame database holds
+all states within depth moves of a goal, computed once by a retrograde breadth first search from the goal states
+(State.goals() and State.predecessors()). For every state it stores the exact distance to the nearest goal and the
+continuation, the first move of a shortest path to a goal. States are identified by solvecache.canonical(), which
+ignores the order of the tubes and the names of the colors, so one record covers all boards that differ only by
+renaming the colors.
+
+The database belongs to one puzzle configuration: height, number of tubes, move mode and the numbers of segments of
+the colors, e.g. all boards of State.create(4, 2, 8, pourAll=True). It is stored as a compact file:
+
+- magic b'WSEG', the length of the header (uint32, little endian) and the header as JSON (configuration, depth,
+  width of a key and number of records)
+- the records sorted by key: the canonical key of solvecache.canonical() with fixed width followed by three bytes
+  distance, source and target tube of the continuation; the tube indexes refer to the tubes of the canonical key,
+  NoMove for goals
+
+Endgame opens the file memory-mapped and looks up a state by binary search, so a database is shared by all processes
+that open it and only the touched pages are loaded. EndgameState is a State whose isGoal() is also true for the
+database states, so every search stops as soon as it reaches a database state; complete() then appends the stored
+continuation up to the real goal. Only states with at most depth color boundaries (heuristics.boundaries, a lower
+bound of the distance) are looked up. The length of a solution is the depth of the database state reached plus its
+distance, so it is not always the shortest one.
+
+Usage:
+    python -m WaterColorPuzzleAfg.search.endgame endgame.db --size 4 --empty 2 --colors 8 --pourAll --depth 5
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+
+from WaterColorPuzzleAfg.game.state import State
+from WaterColorPuzzleAfg.game.heuristics import boundaries
+from WaterColorPuzzleAfg.search.bfsearch import bfs, backtrack
+from WaterColorPuzzleAfg.search.iddfs import iddfs
+from WaterColorPuzzleAfg.search.solvecache import canonical
+
+Magic = b'WSEG'
+NoMove = 0xFF   # source and target of the continuation of a goal
+
+def configuration(state):
+    '''
+    Configuration of the puzzle of state; states with equal configuration share a database
+    @return: dict that is stored in the header of the database file
+    '''
+    counts = {}
+    for tube in state.tubes:
+        for color in tube:
+            counts[color] = counts.get(color, 0) + 1
+    return {'size': state.size, 'tubes': state.tubeCount(), 'pourAll': state.pourAll,
+            'colors': sorted(counts.values())}
+
+def build(start, depth, filename, verbose=True):
+    '''
+    Compute the endgame database of the puzzle of start by a retrograde breadth first search from all goals and
+    write it to filename; the file appears only when complete. The whole table (canonical key and three bytes per
+    record) and the layer being expanded are held in main memory until the file is written, so the memory grows with
+    the number of records: e.g. 172000 records of depth 5 for create(4, 2, 8, pourAll=True).
+    @param depth: maximum distance to a goal of the stored states
+    @param verbose: print the number of states of every layer
+    @return: number of records
+    '''
+    table = {}   # canonical key -> (distance, source, target)
+    layer = []
+    for goal in start.goals():
+        key, _ = canonical(goal)
+        if not key in table:
+            table[key] = (0, NoMove, NoMove)
+            layer.append(goal)
+    if verbose:
+        print(f'endgame: distance=0, states={len(layer)}')
+    for d in range(1, depth+1):
+        nextLayer = []
+        for node in layer:
+            for pred in node.predecessors():
+                key, perm = canonical(pred)
+                if not key in table:
+                    # the forward move pred.action leads to node, one move closer to a goal
+                    i, j = pred.action
+                    table[key] = (d, perm.index(i), perm.index(j))
+                    pred.parent = None
+                    nextLayer.append(pred)
+        layer = nextLayer
+        if verbose:
+            print(f'endgame: distance={d}, states={len(layer)}, total={len(table)}')
+        if not layer:
+            break
+    width = len(next(iter(table)))
+    header = json.dumps(dict(configuration(start), depth=depth, width=width, records=len(table))).encode()
+    with open(filename + '.tmp', 'wb') as f:
+        f.write(Magic + struct.pack('<I', len(header)) + header)
+        for key in sorted(table):
+            f.write(key + bytes(table[key]))
+    os.replace(filename + '.tmp', filename)
+    return len(table)
+
+class Endgame(object):
+    '''
+    Read only, memory mapped endgame database file
+    @ivar header: dict of the configuration, depth, width and records
+    @ivar depth: maximum distance of the stored states
+    @ivar lookups: number of lookups
+    @ivar hits: number of successful lookups
+    '''
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            if f.read(4) != Magic:
+                raise ValueError(f'{filename} is no endgame database')
+            n, = struct.unpack('<I', f.read(4))
+            self.header = json.loads(f.read(n))
+            self.offset = 8 + n
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.depth = self.header['depth']
+        self.width = self.header['width']
+        self.records = self.header['records']
+        self.lookups = 0
+        self.hits = 0
+
+    def close(self):
+        self.data.close()
+
+    def __len__(self):
+        return self.records
+
+    def __contains__(self, state):
+        return self.lookup(state) is not None
+
+    def covers(self, state):
+        '''
+        Check if state belongs to the configuration of the database
+        '''
+        return all(self.header[name] == value for name, value in configuration(state).items())
+
+    def find(self, key):
+        '''
+        Binary search of a canonical key
+        @return: offset of the record within the file, None if the key is not stored
+        '''
+        self.lookups += 1
+        data, width, size = self.data, self.width, self.width + 3
+        lo, hi = 0, self.records
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = self.offset + mid*size
+            other = data[pos:pos+width]
+            if other < key:
+                lo = mid + 1
+            elif other > key:
+                hi = mid
+            else:
+                self.hits += 1
+                return pos
+        return None
+
+    def lookup(self, state):
+        '''
+        Exact distance and continuation of state
+        @return: tuple (distance, move) where move (i, j) refers to the tubes of state and is None for a goal;
+                 None if state is not stored
+        '''
+        if boundaries(state) > self.depth:
+            # every move removes at most one color boundary: state is too far from a goal, no need to search
+            return None
+        key, perm = canonical(state)
+        pos = self.find(key)
+        if pos is None:
+            return None
+        distance, i, j = self.data[pos+self.width:pos+self.width+3]
+        if i == NoMove:
+            return distance, None
+        return distance, (perm[i], perm[j])
+
+    def complete(self, node):
+        '''
+        Follow the stored continuation from node to a goal. If a state is not found (the canonical key of a board
+        with many tied colors is not unique, see solvecache.canonical) the rest of the path is searched by iddfs
+        limited to depth moves, the distance of every state of the database.
+        @return: the goal node with parent chain back through node, None if no goal is found within depth moves
+        '''
+        entry = self.lookup(node)
+        while not State.isGoal(node):
+            if entry is None or entry[1] is None:
+                goal = iddfs(State(*node.tubes, size=node.size, pourAll=node.pourAll), maxDepth=self.depth)
+                if goal is None:
+                    return None
+                for step in reversed(backtrack(goal)[:-1]):
+                    node = node.move(*step.action)
+                return node
+            node = node.move(*entry[1])
+            entry = self.lookup(node)
+        return node
+
+class EndgameState(State):
+    '''
+    State whose isGoal() is true for all states of the endgame database, so a search stops at the first database
+    state; complete the path with solve() or endgame.complete(). The database is the instance attribute endgame, it is
+    passed to all children.
+    '''
+    def __init__(self, *tubes, size, pourAll=False, endgame=None):
+        super().__init__(*tubes, size=size, pourAll=pourAll)
+        self.endgame = endgame
+
+    def isGoal(self):
+        return State.isGoal(self) or self.endgame is not None and self in self.endgame
+
+def solve(start, endgame, search, stats=None):
+    '''
+    Search from start until a database state is reached and complete the path by its continuation
+    @param start: a State of the configuration of endgame
+    @param search: search function like bfs(start, stats)
+    @return: the goal node (EndgameState) with parent chain back to start if found, None else
+    @raise ValueError: if start does not belong to the configuration of endgame
+    '''
+    if not endgame.covers(start):
+        raise ValueError('the board does not belong to the configuration of the endgame database')
+    goal = search(EndgameState(*start.tubes, size=start.size, pourAll=start.pourAll, endgame=endgame), stats)
+    return None if goal is None else endgame.complete(goal)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build an endgame database of the water-sort-puzzle')
+    parser.add_argument('filename', help='database file')
+    parser.add_argument('--size', type=int, default=4, help='height of the tubes')
+    parser.add_argument('--empty', type=int, default=2, help='number of empty tubes')
+    parser.add_argument('--colors', type=int, default=8, help='number of colors')
+    parser.add_argument('--pourAll', action='store_true', help='move mode pourAll')
+    parser.add_argument('--depth', type=int, default=8, help='maximum distance to a goal')
+    parser.add_argument('--test', type=int, default=0, help='number of random boards solved with and without database')
+    args = parser.parse_args(argv)
+    start = State.create(args.size, args.empty, args.colors, pourAll=args.pourAll)
+    t = time.perf_counter()
+    n = build(start, args.depth, args.filename)
+    print(f'endgame: {n} records, {os.path.getsize(args.filename)} bytes, {time.perf_counter()-t:.1f} s')
+    if args.test:
+        from WaterColorPuzzleAfg.search.instrument import Stats
+        endgame = Endgame(args.filename)
+        for _ in range(args.test):
+            start = State.create(args.size, args.empty, args.colors, pourAll=args.pourAll)
+            for name in ('bfs', 'endgame'):
+                stats = Stats(timing=False)
+                t = time.perf_counter()
+                goal = bfs(start, stats) if name == 'bfs' else solve(start, endgame, bfs, stats)
+                print(f'{name:>8}: time={time.perf_counter()-t:.3f} s, expansions={stats.expansions}, '
+                      f'moves={None if goal is None else goal.depth}')
+        print(f'endgame: lookups={endgame.lookups}, hits={endgame.hits}')
+        endgame.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+'''
+Generator of solvable boards for the color-sort-puzzle
+
+State.create() shuffles colors and blanks together, so a board may be unsolvable and the blanks are colors within
+the tubes. Here a board is built backwards: starting from a solved state (full color tubes and really empty tubes
+in random order) random reverse pours (State.reverseMoves) are applied. Every board is solvable by construction and
+the walk itself is a solution, so its length is an upper bound of the optimal depth. The walk never visits a state
+twice and respects the capacity of the tubes in both move modes.
+
+Difficulty is targeted by rejection: minDepth is checked against the admissible boundaries heuristic (a cheap lower
+bound of the optimal depth) or, with exact=True, against the optimal depth found by astar; minBranching is the
+minimal number of moves of the board.
+
+Examples:
+board, moves = generate(4, 2, 8, rng=random.Random(1))
+for board, moves in boards(1000, seed=42, size=4, emptyTubes=2, numColors=8, minDepth=15): ...
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import random
+
+from WaterColorPuzzleAfg.game.state import State
+from WaterColorPuzzleAfg.game.heuristics import boundaries
+from WaterColorPuzzleAfg.search.astar import astar
+
+def solved(size, emptyTubes, numColors, pourAll=True, rng=random):
+    '''
+    Solved state with numColors full tubes of the colors 'A', 'B', ... and emptyTubes empty tubes in random order
+    '''
+    tubes = [(chr(ord('A') + i),) * size for i in range(numColors)] + [()] * emptyTubes
+    rng.shuffle(tubes)
+    return State(*tubes, size=size, pourAll=pourAll)
+
+def walk(goal, steps, rng=random):
+    '''
+    Random walk of at most steps reverse pours from goal without visiting a state twice; it ends early if the
+    state has no unvisited predecessor.
+    @return: the last state of the walk, its parent chain leads back to goal
+    '''
+    size = goal.size
+    seen = {goal}
+    node = goal
+    for _ in range(steps):
+        tubes = node.tubes
+        moves = list(node.reverseMoves())
+        if not goal.pourAll:
+            # the single segment moves of the legacy mode do not check the capacity
+            moves = [(i, j, k) for i, j, k in moves if len(tubes[i]) + k <= size]
+        child = None
+        while moves:
+            # random move without shuffling all moves, the visited ones are removed
+            n = rng.randrange(len(moves))
+            child = node.unpour(*moves[n])
+            if not child in seen:
+                break
+            moves[n] = moves[-1]
+            moves.pop()
+            child = None
+        if child is None:
+            break
+        seen.add(child)
+        node = child
+    return node
+
+def difficulty(board, exact=False):
+    '''
+    Difficulty of a board as tuple of depth and branching
+    @param exact: if True the depth is the optimal number of moves (astar), else the boundaries lower bound
+    @return: tuple (depth, branching); depth is None if exact and no goal exists
+    '''
+    if exact:
+        goal = astar(board, boundaries)
+        depth = None if goal is None else goal.depth
+    else:
+        depth = boundaries(board)
+    return depth, sum(1 for _ in board.children())
+
+def generate(size, emptyTubes, numColors, steps=None, pourAll=True, rng=random, minDepth=0, minBranching=0,
+             exact=False, tries=1000):
+    '''
+    Create a random solvable board by reverse pours from a solved state
+    @param size: maximum number of color segments within a single tube (height)
+    @param emptyTubes: number of empty tubes of the solved state
+    @param numColors: number of different colors, each fills one tube
+    @param steps: number of reverse pours, default 2*size*numColors
+    @param pourAll: move mode of the board
+    @param rng: random number generator, e.g. random.Random(seed) for reproducible boards
+    @param minDepth: minimal depth of the board, see difficulty()
+    @param minBranching: minimal number of moves of the board
+    @param exact: if True minDepth is checked against the optimal depth (slow for large boards)
+    @param tries: number of walks before giving up
+    @return: tuple of the board (a new state without parent) and a solution as list of moves (i, j)
+    @raise ValueError: if no board of the requested difficulty was found within tries walks
+    '''
+    if steps is None:
+        steps = 2 * size * numColors
+    for _ in range(tries):
+        node = walk(solved(size, emptyTubes, numColors, pourAll, rng), steps, rng)
+        board = State(*node.tubes, size=size, pourAll=pourAll)
+        if minDepth or minBranching:
+            if node.depth < minDepth:
+                continue
+            depth, branching = difficulty(board, exact and minDepth > 0)
+            if depth is None or depth < minDepth or branching < minBranching:
+                continue
+        moves = []
+        while node.parent is not None:
+            moves.append(node.action)
+            node = node.parent
+        return board, moves
+    raise ValueError(f'no board with minDepth={minDepth}, minBranching={minBranching} in {tries} tries')
+
+def boards(count, seed=None, *args, **kwargs):
+    '''
+    Generator of count reproducible boards, e.g. for load tests; the arguments are passed to generate()
+    @return: generator of tuples (board, moves)
+    '''
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield generate(*args, rng=rng, **kwargs)
+
+
+# test code
+if __name__ == "__main__":
+    import time
+
+    board, moves = generate(4, 2, 5, rng=random.Random(1))
+    print(f'board = {board}, solution with {len(moves)} moves, difficulty={difficulty(board, exact=True)}')
+    node = board
+    for action in moves:
+        node = node.move(*action)
+    print(f'solution reaches goal: {node.isGoal()}')
+
+    for (size, empty, colors, minDepth) in [(4, 2, 5, 0), (4, 2, 8, 0), (4, 2, 8, 16), (4, 2, 12, 0)]:
+        t = time.perf_counter()
+        n = sum(1 for _ in boards(1000, 42, size, empty, colors, minDepth=minDepth))
+        t = time.perf_counter() - t
+        print(f'generate({size},{empty},{colors}, minDepth={minDepth}): {n/t:.0f} boards/sec')
@@ -0,0 +1,46 @@
+'''
+Heuristic functions for the informed searches (astar, idastar) on the color-sort-puzzle
+
+A heuristic estimates the number of moves from a state to the nearest goal state. All functions work on the tubes
+of state.State (sequences of color symbols, bottom first) and are pluggable into any informed search as h(node).
+
+- zero:        no information, A* becomes uniform cost search; admissible
+- boundaries:  number of color boundaries within all tubes; a single move removes at most one boundary, therefore
+               admissible and consistent in both move modes
+- misplaced:   number of segments differing from the bottom color of their tube; not admissible, because one pourAll
+               move can fix several segments, but well informed for weighted or greedy searches
+
+Created on 17.10.2026
+@author: beh
+'''
+
+def zero(state):
+    '''
+    Heuristic without information
+    '''
+    return 0
+
+def boundaries(state):
+    '''
+    Number of color boundaries, that is neighbour segments of different colors within the same tube
+    '''
+    n = 0
+    for tube in state.tubes:
+        for k in range(1, len(tube)):
+            if tube[k] != tube[k-1]:
+                n += 1
+    return n
+
+def misplaced(state):
+    '''
+    Number of segments that differ from the bottom color of their tube
+    '''
+    n = 0
+    for tube in state.tubes:
+        for color in tube:
+            if color != tube[0]:
+                n += 1
+    return n
+
+# all heuristics by name
+heuristics = {'zero': zero, 'boundaries': boundaries, 'misplaced': misplaced}
@@ -0,0 +1,106 @@
+'''
+Iterative deepening A* search algorithm
+
+Generic algorithm that works on any graph of nodes. The nodes must provide the following instance operations:
+
+- node.isGoal():       returns true if node is a goal of the search
+- node.children():     generator of all child-nodes that can be reached from node
+- node.__eq__(other):  equal operator used to avoid cycles on the current search path
+- node.__hash__():     must correspond to equal for element testing in set
+- node.parent:         the parent node of a node on the search path; only for backtracking
+- node.depth:          number of moves from start to node, that is the path cost g(node)
+
+A series of depth first searches, each limited by a bound of f = g + weight*h. The next bound is the smallest f that
+exceeded the current one. Children are searched in order of increasing h. Besides the current path a transposition
+table of at most tableSize nodes stores the smallest depth of every explored node within one iteration; a node reached
+again at the same or a larger depth is not searched twice. So the memory is bounded by tableSize and solution depth.
+
+Non recursive implementation using built-in list as stack of child generators.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+from WaterColorPuzzleAfg.game.heuristics import zero
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+
+def idastar(start, h=zero, weight=1, tableSize=1000000, stats=None):
+    '''
+    Start an iterative deepening A* search on the given node start.
+    @param start: the node to start the search
+    @param h: heuristic function h(node), estimated number of moves to a goal
+    @param weight: weight of the heuristic, 1 for (optimal) IDA*
+    @param tableSize: maximum number of nodes within the transposition table, 0 for none
+    @param stats: optional instrument.Stats to collect counters and timing of the search
+    @return: the goal node if found, None else
+    '''
+    bound = weight*h(start)
+    goal = None
+    while bound is not None and goal is None:
+        goal, bound = search(start, h, weight, bound, tableSize, stats)
+    if stats is not None:
+        stats.finish(goal)
+    return goal
+
+def search(start, h, weight, bound, tableSize, stats=None):
+    '''
+    Depth first search limited by bound
+    @return: tuple of the goal node, or None; and the next bound, or None if no node exceeded the bound
+    '''
+    if start.isGoal():
+        return start, bound
+    nextBound = None
+    path = {start}           # SET of nodes on the current path
+    table = {} if stats is None else stats.visitedDict()   # transposition table: smallest depth of explored nodes
+    table[start] = 0
+    stack = [(start, expand(start, h, stats))]
+    while stack:
+        node, children = stack[-1]
+        item = next(children, None)
+        if item is None:
+            stack.pop()
+            path.discard(node)
+            continue
+        child, hc = item
+        if child in path:
+            continue
+        f = child.depth + weight*hc
+        if f > bound:
+            if nextBound is None or f < nextBound:
+                nextBound = f
+            continue
+        if child.isGoal():
+            return child, bound
+        g = table.get(child)
+        if g is not None and g <= child.depth:
+            continue
+        if g is not None or len(table) < tableSize:
+            table[child] = child.depth
+        path.add(child)
+        stack.append((child, expand(child, h, stats)))
+        if stats is not None:
+            stats.expanded(len(stack), len(table))
+    return None, nextBound
+
+def expand(node, h, stats=None):
+    '''
+    Iterator of all children together with their heuristic value, ordered by increasing heuristic value
+    '''
+    children = node.children() if stats is None else stats.children(node)
+    li = [(h(child), n, child) for n, child in enumerate(children)]
+    li.sort()
+    return iter([(child, hc) for hc, _, child in li])
+
+
+# test code
+if __name__ == "__main__":
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.game.heuristics import boundaries
+    import time
+
+    start = State.create(4, 2, 10, pourAll=True)
+    print(f'start = {start}')
+    for weight in (1, 2):
+        t = time.time()
+        goal = idastar(start, boundaries, weight)
+        print(f'idastar weight={weight}: time={time.time()-t:.3f} s, moves={len(backtrack(goal))-1}')
@@ -0,0 +1,172 @@
+'''
+Iterative deepening depth first search with a bounded transposition table
+
+Generic algorithm that works on any graph of nodes. The nodes must provide the following instance operations:
+
+- node.isGoal():       returns true if node is a goal of the search
+- node.children():     generator of all child-nodes that can be reached from node
+- node.key:            canonical key of the node, equal nodes have equal keys
+- node.parent:         the parent node of a node on the search path; only for backtracking
+- node.depth:          number of moves from start to node
+
+A series of depth first searches limited by the bound 0, 1, 2, ... of the depth. The first goal found has the
+smallest depth, so the solution is as short as the one of bfs, but only the current path is kept in memory besides
+the transposition table. The table maps the canonical key of every explored node to the remaining depth (bound minus
+depth) it was searched with. No goal is within this depth of the node, so it is searched again only if it is reached
+with more remaining depth: by a shorter path or in a later iteration. A node whose subtree was searched completely,
+without a node cut off by the bound, is a dead end for all iterations. The table holds at most tableSize entries: if
+it is full, a quarter of the entries is evicted, first the ones of former iterations, then the ones with the smallest
+remaining depth (deep nodes prune the least).
+
+Non recursive implementation using built-in list as stack of child generators.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import heapq
+
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+
+Complete = float('inf')   # remaining depth of a node whose subtree was searched completely
+
+class TranspositionTable(object):
+    '''
+    Bounded map of canonical keys to the remaining depth and the iteration of their search
+    @ivar size: maximum number of entries
+    @ivar iteration: number of the current iteration; entries of former iterations stay valid (no goal is within their
+                     remaining depth), the iteration only decides which entries are evicted first
+    @ivar evictions: number of evicted entries
+    '''
+    def __init__(self, size):
+        self.size = size
+        self.entries = {}
+        self.iteration = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def explored(self, node, remaining):
+        '''
+        Check if node was searched with at least the given remaining depth, in this or a former iteration
+        @return: None if not, False if nodes of its subtree were cut off, True if its subtree was searched completely
+        '''
+        entry = self.entries.get(node.key)
+        if entry is None or entry[0] < remaining:
+            return None
+        return entry[0] == Complete
+
+    def store(self, node, remaining):
+        if len(self.entries) >= self.size and not node.key in self.entries:
+            self.evict()
+        self.entries[node.key] = (remaining, self.iteration)
+
+    def complete(self, node):
+        '''
+        Mark node as searched completely without a goal, that is a dead end for all following iterations
+        '''
+        if node.key in self.entries:
+            self.entries[node.key] = (Complete, self.iteration)
+
+    def evict(self):
+        '''
+        Remove a quarter of the entries, the ones of the oldest iterations and with the smallest remaining depth
+        '''
+        n = max(1, self.size // 4)
+        for key, _ in heapq.nsmallest(n, self.entries.items(), key=lambda item: (item[1][1], item[1][0])):
+            del self.entries[key]
+        self.evictions += n
+
+def iddfs(start, maxDepth=None, tableSize=1000000, stats=None):
+    '''
+    Start an iterative deepening depth first search on the given node start.
+    @param start: the node to start the search
+    @param maxDepth: the search is stopped after this bound; None for no limit
+    @param tableSize: maximum number of entries of the transposition table
+    @param stats: optional instrument.Stats to collect counters and timing of the search
+    @return: the goal node if found, None else
+    '''
+    table = TranspositionTable(tableSize)
+    bound = 0
+    goal = None
+    while maxDepth is None or bound <= maxDepth:
+        goal, cutoff = search(start, bound, table, stats)
+        if goal is not None or not cutoff:
+            break
+        bound += 1
+    if stats is not None:
+        stats.finish(goal)
+    return goal
+
+def search(start, bound, table, stats=None):
+    '''
+    Depth first search limited by bound
+    @return: tuple of the goal node, or None; and a flag that is True if a node was cut off by the bound
+    '''
+    table.iteration += 1
+    if start.isGoal():
+        return start, False
+    table.store(start, bound)
+    # stack of [node, child generator, flag if a node within the subtree was cut off]
+    stack = [[start, start.children() if stats is None else stats.children(start), False]]
+    while stack:
+        frame = stack[-1]
+        child = next(frame[1], None)
+        if child is None:
+            stack.pop()
+            node, _, cut = frame
+            if cut:
+                if stack:
+                    stack[-1][2] = True
+            else:
+                table.complete(node)
+            continue
+        if child.isGoal():
+            return child, True
+        remaining = bound - child.depth
+        if remaining <= 0:
+            frame[2] = True
+            continue
+        explored = table.explored(child, remaining)
+        if explored is not None:
+            if not explored:
+                frame[2] = True
+            continue
+        table.store(child, remaining)
+        stack.append([child, child.children() if stats is None else stats.children(child), False])
+        if stats is not None:
+            stats.expanded(len(stack), len(table))
+    return None, cut
+
+
+# test code
+if __name__ == "__main__":
+    import random
+    import tracemalloc
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.bfsearch import bfs
+    from WaterColorPuzzleAfg.search.dfsearch import dfs
+    from WaterColorPuzzleAfg.search.instrument import Stats
+
+    random.seed(3)
+    for start in (State.create(4, 2, 6, pourAll=True), ):
+        print(f'start = {start}')
+        # an entry of a former iteration is used as long as its remaining depth is large enough
+        table = TranspositionTable(10)
+        table.iteration = 1
+        table.store(start, 3)
+        table.iteration = 2
+        print(f'former iteration: explored(start, 3)={table.explored(start, 3)}, '
+              f'explored(start, 4)={table.explored(start, 4)}')
+        optimal = len(backtrack(bfs(start))) - 1
+        for name, algorithm in (('bfs', bfs), ('dfs', dfs), ('iddfs', iddfs),
+                                ('iddfs2k', lambda start, stats: iddfs(start, tableSize=2000, stats=stats))):
+            stats = Stats(timing=False)
+            tracemalloc.start()
+            goal = algorithm(start, stats=stats)
+            memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{name:>8}: time={stats.elapsed:.3f} s, expansions={stats.expansions}, '
+                  f'moves={len(backtrack(goal))-1}, shortest={len(backtrack(goal))-1 == optimal}, '
+                  f'peak memory={memory/1e6:.1f} MB')
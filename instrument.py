@@ -0,0 +1,178 @@
+'''
+Instrumentation of the search algorithms
+
+A Stats object is passed to a search function (parameter stats); without it (stats=None) the search runs its plain
+loop and nothing is measured. The search uses the hooks:
+
+- stats.children(node):  instead of node.children(); counts the generated children and measures the time of 
+                         their generation
+- stats.visitedSet():    instead of set() for the visited nodes; counts duplicates, measures hashing and lookup time
+- stats.visitedDict():   the same for a dictionary of visited nodes
+- stats.expanded(frontier, visited):  after every expansion with the current sizes of frontier and visited
+- stats.expandedLayer(expansions, generated, frontier, visited):  instead of children() and expanded() by 
+                         searches that expand a whole layer at once
+- stats.finish(goal):    at the end of the search, goal is None if the search failed
+
+The counters, the phase times and samples of frontier and visited size over time are exported by toDict(), 
+toJson() and writeCsv(); report() prints a summary.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import csv
+import json
+from time import perf_counter
+
+class Stats(object):
+    '''
+    Counters and timing of a single search run
+    @ivar expansions: number of expanded nodes
+    @ivar generated: number of generated children
+    @ivar duplicates: number of lookups of nodes already visited
+    @ivar times: seconds spent in the phases children, hashing and lookup (only if timing is True)
+    @ivar samples: list of (expansions, elapsed seconds, frontier size, visited size), every interval expansions
+    '''
+    def __init__(self, name='search', timing=True, interval=1000):
+        self.name = name
+        self.timing = timing
+        self.interval = interval
+        self.expansions = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.times = {'children': 0.0, 'hashing': 0.0, 'lookup': 0.0}
+        self.samples = []
+        self.frontier = 0
+        self.visited = 0
+        self.elapsed = 0.0
+        self.depth = None
+        self.started = perf_counter()
+
+    def children(self, node):
+        '''
+        Generator of the children of node, counted and timed
+        '''
+        if not self.timing:
+            for child in node.children():
+                self.generated += 1
+                yield child
+            return
+        times = self.times
+        it = node.children()
+        while True:
+            t = perf_counter()
+            child = next(it, None)
+            times['children'] += perf_counter() - t
+            if child is None:
+                return
+            self.generated += 1
+            yield child
+
+    def visitedSet(self):
+        return VisitedSet(self)
+
+    def visitedDict(self):
+        return VisitedDict(self)
+
+    def expanded(self, frontier, visited):
+        '''
+        Called by the search after every expansion
+        '''
+        self.expansions += 1
+        self.frontier = frontier
+        self.visited = visited
+        if self.expansions % self.interval == 0:
+            self.samples.append((self.expansions, perf_counter() - self.started, frontier, visited))
+
+    def expandedLayer(self, expansions, generated, frontier, visited):
+        '''
+        Called by a layer synchronous search after a whole layer is expanded; frontier is the size of the next layer
+        '''
+        self.expansions += expansions
+        self.generated += generated
+        self.duplicates += generated - frontier
+        self.frontier = frontier
+        self.visited = visited
+        self.samples.append((self.expansions, perf_counter() - self.started, frontier, visited))
+
+    def finish(self, goal):
+        '''
+        Called by the search when it ends; goal is None if no goal was found
+        '''
+        self.elapsed = perf_counter() - self.started
+        self.depth = None if goal is None else goal.depth
+        self.samples.append((self.expansions, self.elapsed, self.frontier, self.visited))
+
+    def lookup(self, contains, node):
+        '''
+        Timed membership test; hashing and lookup are measured separately
+        '''
+        if self.timing:
+            t0 = perf_counter()
+            hash(node)
+            t1 = perf_counter()
+            found = contains(node)
+            self.times['hashing'] += t1 - t0
+            self.times['lookup'] += perf_counter() - t1
+        else:
+            found = contains(node)
+        if found:
+            self.duplicates += 1
+        return found
+
+    def toDict(self):
+        return {'name': self.name, 'elapsed': self.elapsed, 'depth': self.depth, 'expansions': self.expansions,
+                'generated': self.generated, 'duplicates': self.duplicates, 'frontier': self.frontier,
+                'visited': self.visited, 'times': dict(self.times), 
+                'samples': [list(sample) for sample in self.samples]}
+
+    def toJson(self):
+        return json.dumps(self.toDict())
+
+    def writeCsv(self, file):
+        '''
+        Write the samples (expansions, elapsed, frontier, visited) as CSV to an open text file
+        '''
+        writer = csv.writer(file)
+        writer.writerow(['expansions', 'elapsed', 'frontier', 'visited'])
+        writer.writerows(self.samples)
+
+    def report(self):
+        '''
+        Print a summary of the search
+        '''
+        steps = max(self.expansions, 1)
+        print(f'{self.name}: running time={self.elapsed:.3f} s, total expansions={self.expansions}, depth={self.depth}')
+        print(f'{self.name}: avg number of child={self.generated/steps:.2f}, duplicates={self.duplicates/steps:.2f}')
+        print(f'{self.name}: visited={self.visited}, last frontier={self.frontier}')
+        if self.timing:
+            print(f'{self.name}: time children={self.times["children"]:.3f} s, hashing={self.times["hashing"]:.3f} s, '
+                  f'lookup={self.times["lookup"]:.3f} s')
+
+
+class VisitedSet(set):
+    '''
+    Set of visited nodes whose membership test is counted and timed by Stats
+    '''
+    def __init__(self, stats):
+        super().__init__()
+        self.stats = stats
+
+    def __contains__(self, node):
+        return self.stats.lookup(super().__contains__, node)
+
+class VisitedDict(dict):
+    '''
+    Dictionary of visited nodes whose lookups (in, get) are counted and timed by Stats
+    '''
+    def __init__(self, stats):
+        super().__init__()
+        self.stats = stats
+
+    def __contains__(self, node):
+        return self.stats.lookup(super().__contains__, node)
+
+    def get(self, node, default=None):
+        if self.stats.lookup(super().__contains__, node):
+            return self[node]
+        return default
@@ -0,0 +1,193 @@
+'''
+Memory lean breadth first and depth first search algorithms
+
+Generic algorithms that work on any graph of nodes. Besides isGoal() and children() the nodes must provide:
+
+- node.encode(canonical):  compact bytes of the node; with canonical=True equal nodes give equal bytes of a fixed 
+                           width (same width for all nodes of a puzzle)
+- node.decode(data):       new node of the same puzzle from the bytes of encode()
+
+No node objects are kept alive during the search. A KeyTable stores the canonical bytes of every visited node 
+together with the index of its parent's entry, that is about width+6 bytes per node instead of a full object with 
+tuples of tubes. The nodes are decoded again when they are expanded. After the search the path is rebuilt by 
+replaying the moves from start: in each step the child equal to the next stored key is taken. So the returned goal
+has the usual parent chain for backtrack() and the actions match the tube order of start.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+from array import array
+
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+
+class KeyTable(object):
+    '''
+    Set of fixed width keys with a parent reference per key.
+    The keys are appended to a single bytearray, so a key is identified by its index (insertion order). An open 
+    addressing hash index (linear probing, int32 array) finds the index of a key.
+    @ivar width: number of bytes of a key
+    @ivar keys: bytearray of all keys, key n at keys[n*width:(n+1)*width]
+    @ivar parents: int32 array, index of the parent key of key n; -1 for none 
+    '''
+    def __init__(self, width, capacity=1024):
+        self.width = width
+        self.keys = bytearray()
+        self.parents = array('i')
+        self.slots = array('i', [-1]) * capacity
+        self.mask = capacity - 1
+
+    def __len__(self):
+        return len(self.parents)
+
+    def key(self, n):
+        '''
+        Return the key with index n
+        '''
+        return bytes(self.keys[n*self.width:(n+1)*self.width])
+
+    def find(self, key):
+        '''
+        Return the index of the key, -1 if not contained
+        '''
+        slots, keys, w = self.slots, self.keys, self.width
+        pos = hash(key) & self.mask
+        while slots[pos] >= 0:
+            n = slots[pos]
+            if keys[n*w:(n+1)*w] == key:
+                return n
+            pos = (pos+1) & self.mask
+        return -1
+
+    def add(self, key, parent):
+        '''
+        Add a new key with the index of its parent key
+        @return: index of the new key; -1 if the key is already contained
+        '''
+        slots, keys, w = self.slots, self.keys, self.width
+        pos = hash(key) & self.mask
+        while slots[pos] >= 0:
+            n = slots[pos]
+            if keys[n*w:(n+1)*w] == key:
+                return -1
+            pos = (pos+1) & self.mask
+        n = len(self.parents)
+        slots[pos] = n
+        keys += key
+        self.parents.append(parent)
+        if 10*len(self.parents) > 7*len(slots):
+            self._grow()
+        return n
+
+    def _grow(self):
+        '''
+        Double the number of hash slots and insert all indices again
+        '''
+        self.slots = slots = array('i', [-1]) * (2*len(self.slots))
+        self.mask = mask = len(slots) - 1
+        for n in range(len(self.parents)):
+            pos = hash(self.key(n)) & mask
+            while slots[pos] >= 0:
+                pos = (pos+1) & mask
+            slots[pos] = n
+
+    def path(self, n):
+        '''
+        Return the list of keys from the root to key n
+        '''
+        li = []
+        while n >= 0:
+            li.append(self.key(n))
+            n = self.parents[n]
+        li.reverse()
+        return li
+
+
+def leanBfs(start, stats=None):
+    '''
+    Start a memory lean breadth first search on the given node start.
+    The keys are appended in breadth first order, so the KeyTable itself is the FIFO queue of explored nodes.
+    @param start: the node to start the search
+    @param stats: optional instrument.Stats to collect counters and timing of the search
+    @return: the goal node if found, None else 
+    '''
+    table = KeyTable(len(start.encode(canonical=True)))
+    table.add(start.encode(canonical=True), -1)
+    head = 0
+    while head < len(table):
+        node = start.decode(table.key(head))
+        if node.isGoal():
+            return finish(stats, replay(start, table.path(head)))
+        for child in (node.children() if stats is None else stats.children(node)):
+            if table.add(child.encode(canonical=True), head) < 0 and stats is not None:
+                stats.duplicates += 1
+        head += 1
+        if stats is not None:
+            stats.expanded(len(table) - head, len(table))
+    return finish(stats, None)
+
+def leanDfs(start, stats=None):
+    '''
+    Start a memory lean depth first search on the given node start.
+    The stack holds indices into the KeyTable; nodes are marked as visited when pushed. 
+    @param start: the node to start the search
+    @param stats: optional instrument.Stats to collect counters and timing of the search
+    @return: the goal node if found, None else 
+    '''
+    table = KeyTable(len(start.encode(canonical=True)))
+    stack = array('i', [table.add(start.encode(canonical=True), -1)])
+    while len(stack) != 0:
+        index = stack.pop()
+        node = start.decode(table.key(index))
+        if node.isGoal():
+            return finish(stats, replay(start, table.path(index)))
+        for child in (node.children() if stats is None else stats.children(node)):
+            n = table.add(child.encode(canonical=True), index)
+            if n >= 0:
+                stack.append(n)
+            elif stats is not None:
+                stats.duplicates += 1
+        if stats is not None:
+            stats.expanded(len(stack), len(table))
+    return finish(stats, None)
+
+def finish(stats, goal):
+    if stats is not None:
+        stats.finish(goal)
+    return goal
+
+def replay(start, keys, keyOf=None):
+    '''
+    Replay the path given by the canonical keys from start, keys[0] is the key of start.
+    @param keyOf: function of the key of a node, default: node.encode(canonical=True)
+    @return: the last node with parent chain back to start
+    @raise ValueError: if a key is not the key of a child of the node before
+    '''
+    if keyOf is None:
+        keyOf = lambda node: node.encode(canonical=True)
+    node = start
+    for n, key in enumerate(keys[1:], 1):
+        child = next((child for child in node.children() if keyOf(child) == key), None)
+        if child is None:
+            raise ValueError(f'invalid path: state {n} is no child of {node}')
+        node = child
+    return node
+
+
+# test code
+if __name__ == "__main__":
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.bfsearch import bfs
+    from WaterColorPuzzleAfg.search.dfsearch import dfs
+    import random
+    import tracemalloc
+
+    random.seed(3)
+    start = State.create(4, 2, 5)
+    print(f'start = {start}')
+    for search in (bfs, leanBfs, dfs, leanDfs):
+        tracemalloc.start()
+        goal = search(start)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'{search.__name__}: moves={len(backtrack(goal))-1}, peak memory={peak/2**20:.1f} MB')
@@ -0,0 +1,141 @@
+'''
+Parallel breadth first search algorithm
+
+Level synchronous breadth first search on several processes. Besides the operations needed by bfs the nodes must
+provide:
+
+- node.encode(canonical):  compact bytes of the node; with canonical=True equal nodes give equal bytes
+- node.decode(data):       new node of the same puzzle from the bytes of encode()
+
+Every worker process owns one shard of the visited set and the nodes of the current layer within this shard, the
+shard of a node is given by a hash of its canonical bytes. For each depth layer every worker expands its own nodes
+and sends the children - as bytes, not as node objects - directly to the worker that owns their shard, over the
+queue of that shard; there they are deduplicated and become the owner's part of the next layer. The main process
+only starts the layers and receives the number of new nodes and the first goal of every shard, no node passes
+through it.
+
+A node carries its path, the indexes of the children from start to the node. Ordered by path the nodes of a layer
+are ordered like the FIFO queue of bfs (by order of the parent, then by order of the children), so every shard
+keeps the first occurrence of a duplicate in bfs order and the first goal is the one with the smallest path. So
+the search returns the same goal and parent chain as bfs(); the path is rebuilt by replaying node.children(). The
+paths take memory proportional to the depth for every node of the current layer.
+
+Implementation using multiprocessing.Process, a Pipe per worker for the control messages and a Queue per shard for
+the children.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+from itertools import islice
+from multiprocessing import Pipe, Process, Queue
+from zlib import crc32
+
+def pbfs(start, workers=4, maxDepth=None):
+    '''
+    Start a parallel breadth first search on the given node start.
+    @param start: the node to start the search
+    @param workers: number of worker processes, also number of shards of the visited set
+    @param maxDepth: search is stopped after this depth; None for no limit
+    @return: the goal node if found, None else 
+    '''
+    if start.isGoal():
+        return start
+    queues = [Queue() for _ in range(workers)]
+    conns = []
+    for shard in range(workers):
+        conn, child = Pipe()
+        Process(target=serve, args=(child, queues, start, shard, workers), daemon=True).start()
+        conns.append(conn)
+    try:
+        depth = 0
+        while maxDepth is None or depth < maxDepth:
+            for conn in conns:
+                conn.send(('expand',))
+            results = [conn.recv() for conn in conns]   # per shard: number of new nodes, path of the first goal
+            depth += 1
+            goals = [goal for _, goal in results if goal is not None]
+            if goals:
+                return rebuild(start, min(goals))
+            if not any(count for count, _ in results):
+                break
+        return None
+    finally:
+        for conn in conns:
+            conn.send(('stop',))
+
+def rebuild(start, path):
+    '''
+    Rebuild the node reached by the given path (indexes of the children) from start
+    @return: the node with parent chain back to start
+    '''
+    node = start
+    for n in path:
+        node = next(islice(node.children(), n, None))
+    return node
+
+def serve(conn, queues, start, shard, workers):
+    '''
+    Worker process owning one shard of the visited set and the nodes of the current layer within the shard.
+    Control messages:
+    ('expand',):  expand the nodes of the shard, send the children to the queues of their shards and receive the
+                  children of all workers from the queue of this shard; answers the number of new nodes and the
+                  path of the first goal among them (None if there is none); the new nodes are the next layer
+    ('stop',):    terminates the worker
+    The children are sent as one list per worker and shard of tuples (path, canonical bytes, bytes, isGoal).
+    '''
+    key = start.encode(canonical=True)
+    visited = set()
+    frontier = []   # (bytes, path) of the nodes of the current layer within this shard
+    if crc32(key) % workers == shard:
+        visited.add(key)
+        frontier.append((start.encode(), ()))
+    while True:
+        msg = conn.recv()
+        if msg[0] != 'expand':
+            break
+        buckets = [[] for _ in range(workers)]
+        for data, path in frontier:
+            for n, child in enumerate(start.decode(data).children()):
+                key = child.encode(canonical=True)
+                s = crc32(key) % workers
+                if s == shard and key in visited:
+                    continue     # duplicate of a former layer, known without sending it
+                buckets[s].append((path + (n,), key, child.encode(), child.isGoal()))
+        for s, bucket in enumerate(buckets):
+            if s != shard:
+                queues[s].put(bucket)
+        entries = buckets[shard]
+        for _ in range(workers-1):
+            entries.extend(queues[shard].get())
+        entries.sort(key=lambda entry: entry[0])   # bfs order
+        frontier, goal = [], None
+        for path, key, data, isGoal in entries:
+            if not key in visited:
+                visited.add(key)
+                frontier.append((data, path))
+                if isGoal and goal is None:
+                    goal = path
+        conn.send((len(frontier), goal))
+
+
+# test code
+if __name__ == "__main__":
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.bfsearch import bfs, backtrack
+    import random
+    import time
+
+    random.seed(4212)
+    start = State.create(4, 2, 12)
+    print(f'start = {start}')
+    for workers in (1, 2, 4, 8):
+        t = time.time()
+        pbfs(start, workers, maxDepth=5)
+        print(f'pbfs workers={workers}: 5 layers in {time.time()-t:.2f} s')
+
+    start = State.create(4, 2, 8, pourAll=True)
+    goal = bfs(start)
+    for workers in (1, 4):
+        pgoal = pbfs(start, workers)
+        print(f'pbfs workers={workers}: same path as bfs: {[n.tubes for n in backtrack(goal)] == [n.tubes for n in backtrack(pgoal)]}')
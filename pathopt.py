@@ -0,0 +1,133 @@
+'''
+Post-optimizer of solution paths
+
+A path found by dfs (or any non optimal search) often contains detours: pours that are undone later and cycles
+through equal states. optimize() shortens a path as returned by backtrack() in three stages:
+
+- removeLoops():  a state that occurs twice on the path (equal canonical key) is a loop, the states between both
+                  occurrences are removed
+- merge:          shortcuts() with depth 1; a sub-path whose end is a child of its beginning is replaced by a single
+                  move, e.g. two pours of the same color A->B, B->C by A->C
+- shortcuts():    a small breadth first search of the given depth from every state of the path; a sub-path is
+                  replaced by a shorter path to a later state of the path (or to any goal)
+
+The result is a new chain of nodes created by node.children(), so the returned goal has a valid parent chain and
+actions back to the start of the path, and it is never longer than the original path. Every node of the path must be
+a child (children()) of the node before, else ValueError is raised. The nodes must provide the operations needed by
+bfs and node.key, the identity of a state in all stages; PartialOrderState must not be used, see State.
+
+Example:
+goal = optimize(backtrack(dfs(start)))
+
+Created on 17.10.2026
+@author: beh
+'''
+
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+from WaterColorPuzzleAfg.search.leansearch import replay
+
+def optimize(path, window=5):
+    '''
+    Shorten a solution path
+    @param path: list of nodes as returned by backtrack(), goal first and start last
+    @param window: depth of the breadth first searches of shortcuts(); 0 only removes the loops
+    @return: the goal node with parent chain back to the start of path
+    @raise ValueError: if path is empty or a node is not a child of the node before
+    '''
+    if not path:
+        raise ValueError('empty path')
+    nodes = removeLoops(list(reversed(path)))
+    for depth in range(1, window+1):
+        # repeat the merge and the windowed searches until the path is not shortened anymore
+        length = None
+        while length != len(nodes):
+            length = len(nodes)
+            nodes = shortcuts(nodes, 1)
+            if depth > 1:
+                nodes = shortcuts(nodes, depth)
+    return nodes[-1]
+
+def removeLoops(nodes):
+    '''
+    Remove all loops from the path given by nodes (start first) using an index of the canonical keys
+    @return: list of the nodes of the path without loops replayed from start by leansearch.replay(), start first
+    @raise ValueError: if a node of the path without loops is not a child of the node before
+    '''
+    index = {}   # canonical key -> position in keys
+    keys = []
+    for node in nodes:
+        key = node.key
+        n = index.get(key)
+        if n is None:
+            index[key] = len(keys)
+            keys.append(key)
+        else:
+            # back to the first occurrence: the states since then were a loop
+            for key in keys[n+1:]:
+                del index[key]
+            del keys[n+1:]
+    return list(reversed(backtrack(replay(nodes[0], keys, keyOf=lambda node: node.key))[:len(keys)]))
+
+def shortcuts(nodes, depth):
+    '''
+    Replace sub-paths of the path given by nodes (start first) by shorter ones found by a breadth first search of at
+    most depth moves from every node of the path; a goal found by the search ends the path.
+    @return: list of the nodes of the shortened path, start first
+    @raise ValueError: if no child of a node of the path leads further along the path
+    '''
+    last = len(nodes) - 1
+    index = {node.key: n for n, node in enumerate(nodes)}
+    result = [nodes[0]]
+    n = 0
+    while n < last:
+        node = result[-1]
+        best, target = None, None   # best: (saved moves, path position), target: node reached by the search
+        visited = {node}
+        layer = [node]
+        for d in range(1, depth+1):
+            nextLayer = []
+            for parent in layer:
+                for child in parent.children():
+                    if child in visited:
+                        continue
+                    visited.add(child)
+                    nextLayer.append(child)
+                    k = last if child.isGoal() else index.get(child.key)
+                    if k is not None and k > n and (best is None or k - n - d > best[0]):
+                        best, target = (k - n - d, k), child
+            layer = nextLayer
+        if target is None:
+            # not for a path of children(): the next node of the path is always found at depth 1
+            raise ValueError(f'invalid path: no child of {node} leads further along the path')
+        result.extend(reversed(backtrack(target)[:target.depth-node.depth]))
+        n = best[1]
+    return result
+
+
+# test code
+if __name__ == "__main__":
+    import random
+    import time
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.bfsearch import bfs
+    from WaterColorPuzzleAfg.search.dfsearch import dfs
+
+    random.seed(5)
+    for start in (State.create(4, 2, 4), State.create(4, 2, 8, pourAll=True), State.create(4, 2, 10, pourAll=True)):
+        path = backtrack(dfs(start))
+        optimal = len(backtrack(bfs(start))) - 1 if len(start.tubes) < 12 else None
+        print(f'start = {start}')
+        print(f'  dfs: moves={len(path)-1}, bfs: moves={optimal}')
+        for window in (0, 1, 3, 5):
+            t = time.perf_counter()
+            goal = optimize(path, window)
+            t = time.perf_counter() - t
+            node = start
+            for action in [node.action for node in reversed(backtrack(goal)[:-1])]:
+                node = node.move(*action)
+            print(f'  window={window}: moves={goal.depth}, valid={node.isGoal()}, time={t:.3f} s')
+    # a path with a missing step is rejected
+    try:
+        optimize(path[:5] + path[6:])
+    except ValueError as e:
+        print(f'ValueError: {e}')
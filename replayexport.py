@@ -0,0 +1,281 @@
+'''
+Headless replay of a solution without Tk
+
+A solution path (the states from start to goal, e.g. reversed(backtrack(goal))) is rendered with the geometry and the
+color assignment of WaterSortCanvas, taken from displaystyle (no tkinter needed), either as a sequence of SVG files
+(one per step) or as a single self-contained HTML player. Both writers consume the path as an iterator and write every
+frame immediately; the HTML player stores only the changed segments of each step, so solutions with thousands of moves
+need neither all frames in memory nor a large file.
+As in the GUI, each frame shows a state and the arrow of the next move.
+
+Examples:
+writeSvgFrames(reversed(backtrack(goal)), 'frames')
+writeHtml(replay(start, moves), 'solution.html')
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import os
+from html import escape
+
+from WaterColorPuzzleAfg.view import displaystyle as style
+
+# geometric sizes in pixel and colors of the canvas; displaystyle does not need tkinter
+width  = style.Width
+height = style.Height
+gap    = style.Gap
+top    = style.Top
+left   = style.Left
+right  = style.Right
+bottom = style.Bottom
+
+# RGB values of the Tk color names used by WaterSortCanvas, some of them are no SVG color names
+WebColors = {"black": "#000000", "beige": "#f5f5dc", "DeepPink": "#ff1493", "DarkOrange": "#ff8c00",
+             "yellow2": "#eeee00", "BlueViolet": "#8a2be2", "aquamarine": "#7fffd4", "DarkRed": "#8b0000",
+             "CadetBlue": "#5f9ea0", "YellowGreen": "#9acd32", "chocolate": "#d2691e", "DarkGrey": "#a9a9a9",
+             "dark magenta": "#8b008b", "DarkCyan": "#008b8b", "DarkOliveGreen": "#556b2f",
+             "SpringGreen": "#00ff7f", "DeepSkyBlue": "#00bfff", "ForestGreen": "#228b22"}
+
+def webColor(name):
+    return WebColors.get(name, name)
+
+class Layout(object):
+    '''
+    Geometry and color map of a puzzle, fixed by its start state as in WaterSortCanvas.initialize()
+    @ivar count: number of tubes
+    @ivar size: number of displayed segments per tube
+    @ivar colorMap: web color of every symbol, None is the background
+    '''
+    def __init__(self, start):
+        self.count = start.tubeCount()
+        self.size = start.tubeSize()
+        self.width = left + self.count*width + (self.count-1)*gap + right
+        self.height = top + self.size*height + bottom
+        names = {None: style.backgroundColor}
+        colors = style.waterColors
+        for i in range(self.count):
+            for j in range(self.size):
+                c = start.get(i, j)
+                if not c in names:
+                    names[c] = colors[(len(names)-3) % len(colors)]
+        self.colorMap = {c: webColor(name) for c, name in names.items()}
+
+    def symbols(self, state):
+        '''
+        Displayed symbols of a state as tuple of tuples, positions beyond size are not displayed
+        '''
+        return tuple(tuple(state.get(i, j) for j in range(self.size)) for i in range(self.count))
+
+    def segment(self, i, j, color, ident=''):
+        '''
+        SVG element of the color segment at tube i and position j; the bottom segment is a half ellipse
+        '''
+        x = left + i*(width + gap)
+        y = top + (self.size-1-j)*height
+        if j == 0:
+            return (f'<path{ident} d="M{x},{y} L{x+width},{y} A{width/2},{height} 0 0 1 {x},{y} Z" '
+                    f'fill="{color}"/>')
+        return f'<rect{ident} x="{x}" y="{y}" width="{width}" height="{height}" fill="{color}"/>'
+
+    def tube(self, i):
+        '''
+        SVG elements of the outline of tube i
+        '''
+        x = left + i*(width + gap)
+        yu = top + (self.size-1)*height
+        col = webColor(style.lineColor)
+        return (f'<path d="M{x},{top-5} L{x},{yu} A{width/2},{height} 0 0 0 {x+width},{yu} L{x+width},{top-5}" '
+                f'fill="none" stroke="{col}" stroke-width="3"/>')
+
+    def arrow(self, action):
+        '''
+        SVG polyline of the arrow of a move (fr, to), an empty string if there is no move
+        '''
+        if action is None or action[0] == action[1]:
+            return ''
+        fr, to = action
+        dx = width//2
+        x1 = left + fr*(width+gap) + dx
+        x2 = left + to*(width+gap) + dx
+        y0 = top//4
+        y1 = top*3//4
+        dx = dx if fr < to else -dx
+        col = webColor(style.lineColor)
+        return (f'<polyline points="{x1},{y1} {x1+dx},{y0} {x2-dx},{y0} {x2},{y1}" fill="none" stroke="{col}" '
+                f'stroke-width="3" marker-end="url(#head)"/>')
+
+    def svg(self, symbols, action=None):
+        '''
+        Complete SVG document of one frame
+        @param symbols: displayed symbols, see symbols()
+        @param action: the next move shown as arrow, None for no arrow
+        '''
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}">',
+                 self.defs(),
+                 f'<rect width="100%" height="100%" fill="{self.colorMap[None]}"/>']
+        for i in range(self.count):
+            for j in range(self.size):
+                parts.append(self.segment(i, j, self.colorMap[symbols[i][j]]))
+            parts.append(self.tube(i))
+        parts.append(self.arrow(action))
+        parts.append('</svg>\n')
+        return '\n'.join(parts)
+
+    def defs(self):
+        col = webColor(style.lineColor)
+        return (f'<defs><marker id="head" markerWidth="4" markerHeight="4" refX="2" refY="2" orient="auto">'
+                f'<path d="M0,0 L4,2 L0,4 Z" fill="{col}"/></marker></defs>')
+
+def frames(path):
+    '''
+    Generator of the frames of a solution path: tuples of the state and the next move (None for the last state)
+    @param path: iterable of the states from start to goal, each state results from the one before by a move
+    '''
+    it = iter(path)
+    state = next(it, None)
+    for nx in it:
+        yield state, nx.action
+        state = nx
+    if state is not None:
+        yield state, None
+
+def replay(start, moves):
+    '''
+    Generator of the states from start by the given moves; a solution path without backtrack()
+    '''
+    yield start
+    for action in moves:
+        start = start.move(*action)
+        yield start
+
+def writeSvgFrames(path, directory, prefix='step'):
+    '''
+    Write one SVG file per state of the solution path into directory: prefix_0000.svg, prefix_0001.svg, ...
+    @return: number of written frames
+    '''
+    os.makedirs(directory, exist_ok=True)
+    layout = None
+    n = 0
+    for n, (state, action) in enumerate(frames(path), 1):
+        if layout is None:
+            layout = Layout(state)
+        with open(os.path.join(directory, f'{prefix}_{n-1:04d}.svg'), 'w') as file:
+            file.write(layout.svg(layout.symbols(state), action))
+    return n
+
+def writeHtml(path, filename, title='Water Sort Puzzle', delay=500):
+    '''
+    Write a self-contained HTML player of the solution path: the SVG of the start state and the list of steps,
+    every step holds the changed segments as [i, j, old color, new color] and the next move.
+    @param delay: milliseconds per step when playing
+    @return: number of written frames
+    '''
+    layout = None
+    n = 0
+    with open(filename, 'w') as file:
+        for state, action in frames(path):
+            if layout is None:
+                layout = Layout(state)
+                shown = layout.symbols(state)
+                colors = sorted(set(layout.colorMap.values()))
+                index = {c: k for k, c in enumerate(colors)}
+                file.write(HtmlHead.format(title=escape(title), delay=delay, colors=colors,
+                                           svg=htmlSvg(layout, shown)))
+            else:
+                symbols = layout.symbols(state)
+                changes = [[i, j, index[layout.colorMap[shown[i][j]]], index[layout.colorMap[symbols[i][j]]]]
+                           for i in range(layout.count) if symbols[i] != shown[i]
+                           for j in range(layout.size) if symbols[i][j] != shown[i][j]]
+                shown = symbols
+                file.write(f'{changes},\n')
+            file.write(f'{list(action) if action else "null"},\n')
+            n += 1
+        if layout is not None:
+            file.write(HtmlGeometry.format(width=width, gap=gap, top=top, left=left,
+                                           line=webColor(style.lineColor)))
+            file.write(HtmlTail)
+    return n
+
+def htmlSvg(layout, symbols):
+    '''
+    SVG element of the HTML player, the segments are addressable by their id s<i>_<j>
+    '''
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{layout.width}" height="{layout.height}">',
+             layout.defs(),
+             f'<rect width="100%" height="100%" fill="{layout.colorMap[None]}"/>']
+    for i in range(layout.count):
+        for j in range(layout.size):
+            parts.append(layout.segment(i, j, layout.colorMap[symbols[i][j]], f' id="s{i}_{j}"'))
+        parts.append(layout.tube(i))
+    parts.append('<g id="arrow"></g></svg>')
+    return '\n'.join(parts)
+
+HtmlHead = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body style="background:#202020;color:#f5f5dc;font-family:sans-serif">
+{svg}
+<div><button onclick="go(0)">|&lt;</button> <button onclick="go(pos-1)">&lt;</button>
+<button id="play" onclick="play()">play</button> <button onclick="go(pos+1)">&gt;</button>
+<button onclick="go(last)">&gt;|</button> <span id="info"></span></div>
+<script>
+const delay = {delay};
+const colors = {colors};
+const data = [
+'''
+
+HtmlGeometry = '''];
+const w = {width}, gap = {gap}, top = {top}, left = {left}, line = '{line}';
+'''
+
+HtmlTail = '''// data: move of frame 0, then for every further frame its changed segments and its next move
+const moves = [data[0]], changes = [[]];
+for (let k = 1; k < data.length; k += 2) { changes.push(data[k]); moves.push(data[k+1]); }
+const last = moves.length - 1;
+let pos = 0, timer = null;
+function paint(change, forward) {
+  for (const [i, j, o, n] of change)
+    document.getElementById('s' + i + '_' + j).setAttribute('fill', colors[forward ? n : o]);
+}
+function arrow(move) {
+  const g = document.getElementById('arrow');
+  if (!move) { g.innerHTML = ''; return; }
+  const [fr, to] = move, dx0 = w/2;
+  const x1 = left + fr*(w+gap) + dx0, x2 = left + to*(w+gap) + dx0, y0 = top/4, y1 = top*3/4;
+  const dx = fr < to ? dx0 : -dx0;
+  g.innerHTML = '<polyline points="' + [x1, y1, x1+dx, y0, x2-dx, y0, x2, y1].join(' ') +
+    '" fill="none" stroke="' + line + '" stroke-width="3" marker-end="url(#head)"/>';
+}
+function go(k) {
+  k = Math.max(0, Math.min(last, k));
+  while (pos < k) paint(changes[++pos], true);
+  while (pos > k) paint(changes[pos--], false);
+  arrow(moves[pos]);
+  document.getElementById('info').textContent = 'step ' + pos + ' / ' + last;
+  if (pos == last && timer) play();
+}
+function play() {
+  if (timer) { clearInterval(timer); timer = null; }
+  else timer = setInterval(() => go(pos+1), delay);
+  document.getElementById('play').textContent = timer ? 'pause' : 'play';
+}
+go(0);
+</script></body></html>
+'''
+
+
+# test code
+if __name__ == "__main__":
+    import sys
+    import time
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.search.dfsearch import dfs
+    from WaterColorPuzzleAfg.search.bfsearch import backtrack
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else 'replay'
+    start = State.create(5, 2, 8)
+    goal = dfs(start)
+    t = time.time()
+    n = writeSvgFrames(reversed(backtrack(goal)), os.path.join(directory, 'frames'))
+    writeHtml(reversed(backtrack(goal)), os.path.join(directory, 'solution.html'))
+    print(f'{n} frames written to {directory} in {time.time()-t:.3f} s')
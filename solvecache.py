@@ -0,0 +1,165 @@
+'''
+Persistent cache of solutions of the water-sort-puzzle
+
+The cache key of a board is a canonical form that ignores the order of the tubes (as State.__hash__ does) and also 
+the names of the colors: the colors are renamed by an invariant signature (positions of their segments and their 
+neighbour colors), ties are resolved by trying all renamings of the tied colors (up to a limit) and taking the 
+smallest board. Boards that differ only by tube order and color names share one entry; the moves are stored for the
+canonical tube order and mapped back to the tube indexes of the caller.
+
+The cache is a local SQLite file. Every entry remembers its last use, the least recently used entries are evicted 
+when the number of entries exceeds maxEntries. Unsolvable boards are cached as well.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import sqlite3
+from itertools import groupby, permutations, product
+from math import factorial, prod
+
+from WaterColorPuzzleAfg.search.dfsearch import dfs, backtrack
+
+MaxRenamings = 120   # maximum number of renamings of tied colors that are compared
+
+def canonical(state):
+    '''
+    Canonical form of a board that ignores the order of the tubes and the names of the colors
+    @param state: a state.State 
+    @return: tuple of the key (bytes) and the tube permutation: canonical tube k is tube perm[k] of state
+    '''
+    tubes = state.tubes
+    places = {}   # color -> list of (tube length, position, color below, color above)
+    for tube in tubes:
+        for j, color in enumerate(tube):
+            below = tube[j-1] if j > 0 else None
+            above = tube[j+1] if j+1 < len(tube) else None
+            places.setdefault(color, []).append((len(tube), j, below, above))
+    signature = {color: tuple(sorted((n, j) for n, j, _, _ in li)) for color, li in places.items()}
+    refined = {color: (signature[color], 
+                       tuple(sorted((n, j, signature.get(below, ()), signature.get(above, ())) for n, j, below, above in li)))
+               for color, li in places.items()}
+    colors = sorted(places, key=lambda color: refined[color])
+    groups = [list(group) for _, group in groupby(colors, key=lambda color: refined[color])]
+    if prod(factorial(len(group)) for group in groups) <= MaxRenamings:
+        orders = (sum(order, ()) for order in product(*[permutations(group) for group in groups]))
+    else:
+        orders = [tuple(colors)]
+    best = None
+    for order in orders:
+        code = {color: n+1 for n, color in enumerate(order)}
+        rows = sorted((tuple(code[color] for color in tube), i) for i, tube in enumerate(tubes))
+        board = tuple(row for row, _ in rows)
+        if best is None or board < best[0]:
+            best = (board, [i for _, i in rows])
+    board, perm = best
+    data = bytearray([state.size, 1 if state.pourAll else 0])
+    for tube in board:
+        data.extend(tube)
+        data.append(0)
+    return bytes(data), perm
+
+
+class SolutionCache(object):
+    '''
+    Persistent cache of solutions, see module description
+    @ivar hits: number of lookups found in the cache
+    @ivar misses: number of lookups not found in the cache
+    '''
+    def __init__(self, filename='solutions.db', maxEntries=100000):
+        self.db = sqlite3.connect(filename)
+        self.db.execute('CREATE TABLE IF NOT EXISTS solutions (key BLOB PRIMARY KEY, moves BLOB, used INTEGER)')
+        self.maxEntries = maxEntries
+        self.hits = 0
+        self.misses = 0
+        self.clock = self.db.execute('SELECT COALESCE(MAX(used), 0) FROM solutions').fetchone()[0]
+
+    def hitRate(self):
+        '''
+        Ratio of lookups found in the cache
+        '''
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def lookup(self, state):
+        '''
+        Look up the solution of a board
+        @return: tuple (found, moves); moves is the list of actions (i, j) for the tube order of state, or None if 
+                 the board is unsolvable
+        '''
+        key, perm = canonical(state)
+        row = self.db.execute('SELECT moves FROM solutions WHERE key=?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self.clock += 1
+        self.db.execute('UPDATE solutions SET used=? WHERE key=?', (self.clock, key))   # committed by store/close
+        if row[0] is None:
+            return True, None
+        moves = row[0]
+        return True, [(perm[moves[n]], perm[moves[n+1]]) for n in range(0, len(moves), 2)]
+
+    def store(self, state, moves):
+        '''
+        Store the solution of a board
+        @param moves: list of actions (i, j) for the tube order of state; None if the board is unsolvable
+        '''
+        key, perm = canonical(state)
+        inverse = {i: k for k, i in enumerate(perm)}
+        data = None if moves is None else bytes(inverse[i] for action in moves for i in action)
+        self.clock += 1
+        self.db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)', (key, data, self.clock))
+        count = self.db.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+        if count > self.maxEntries:
+            self.db.execute('DELETE FROM solutions WHERE key IN (SELECT key FROM solutions ORDER BY used LIMIT ?)',
+                            (count - self.maxEntries,))
+        self.db.commit()
+
+    def solve(self, start, search=dfs):
+        '''
+        Solve a board by the cache or by search; a solution found by search is stored.
+        @param search: search function used on a cache miss, e.g. bfs or dfs
+        @return: the goal node with parent chain back to start, as returned by search; None if unsolvable
+        '''
+        found, moves = self.lookup(start)
+        if not found:
+            goal = search(start)
+            self.store(start, None if goal is None else [node.action for node in reversed(backtrack(goal)[:-1])])
+            return goal
+        if moves is None:
+            return None
+        node = start
+        for action in moves:
+            node = node.move(*action)
+        return node
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+
+# test code
+if __name__ == "__main__":
+    from WaterColorPuzzleAfg.game.state import State
+    import random
+    import tempfile
+    import time
+    import os
+
+    random.seed(9)
+    start = State.create(4, 2, 8, pourAll=True)
+    # same board with other tube order and other color names
+    rename = {chr(ord('A')+n): chr(ord('a')+(n*3) % 8) for n in range(8)}
+    tubes = [[rename[c] for c in tube] for tube in start.tubes]
+    random.shuffle(tubes)
+    other = State(*tubes, size=4, pourAll=True)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SolutionCache(os.path.join(directory, 'solutions.db'))
+        for board in (start, other, other):
+            t = time.perf_counter()
+            goal = cache.solve(board)
+            print(f'solve: time={(time.perf_counter()-t)*1e6:.0f} us, moves={len(backtrack(goal))-1}, '
+                  f'goal={goal.isGoal()}, hit rate={cache.hitRate():.2f}')
+        cache.close()
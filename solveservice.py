@@ -0,0 +1,356 @@
+'''
+Asyncio solving service of the water-sort-puzzle
+
+A local TCP server for a web backend: it accepts boards, solves them on a pool of worker processes with a deadline
+per request and answers as soon as a board is solved. The protocol is JSON lines in both directions:
+
+- request: a board line of batchsolve, e.g.
+      {"id": 1, "tubes": ["BFDC", "CB", "DECE", "BAB", "ACA", "DF", "DEF", "AFE", "", ""], "size": 4}
+  with the optional fields algorithm (see batchsolve.algorithms) and deadline (seconds, at most maxSeconds)
+- response: the result dictionary of batchsolve.solveBoard() with the id of the request and the field shared, which
+  is true if the request joined the solve of an equal board; status timeout if the deadline has passed
+
+Requests of one connection are handled concurrently, the responses are written in order of completion.
+Concurrent requests for equal boards (equal State.key, that is the order of the tubes is ignored) with the same
+algorithm share one solve; the moves are mapped to the tube order of every request. A solve runs with the budget of
+the request that started it. A request whose deadline is later than the end of this budget starts a new solve
+if the shared one ran out of time. If all requests of a solve are gone (deadline or closed connection), the solve is
+cancelled while it waits for a worker; a solve already running in a worker stops at the absolute deadline of its
+budget, however long it waited in the queue of the pool.
+
+SolveClient is a client for many concurrent requests on one connection; loadTest() measures throughput and latency
+with a corpus of generated boards, a part of them repeated in shuffled tube order to exercise the sharing.
+
+Usage:
+    python -m WaterColorPuzzleAfg.search.solveservice serve --port 8765 --workers 4
+    python -m WaterColorPuzzleAfg.search.solveservice loadtest --requests 500 --concurrency 50 --duplicates 0.3
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from WaterColorPuzzleAfg.game.state import State
+from WaterColorPuzzleAfg.search.batchsolve import algorithms, parse, solveBoard
+from WaterColorPuzzleAfg.search.generator import boards
+
+MinSeconds = 0.05   # minimal remaining time of a request to start a new solve
+
+class Solve(object):
+    '''
+    A solve of a board that is shared by all requests for equal boards
+    @ivar future: asyncio future of the result of batchsolve.solveBoard()
+    @ivar tubes: tubes of the solved board, the moves of the result refer to their order
+    @ivar end: loop time at which the budget of the solve ends
+    @ivar waiters: number of requests waiting for the result
+    '''
+    def __init__(self, future, tubes, end):
+        self.future = future
+        self.tubes = tubes
+        self.end = end
+        self.waiters = 0
+
+class SolveService(object):
+    '''
+    Server that solves the boards of all connections on a process pool
+    @ivar running: dict of the running solves by coalescing key (canonical key, size, move mode, algorithm)
+    @ivar requests: number of handled requests
+    @ivar solves: number of started solves
+    @ivar shared: number of requests that joined a running solve
+    '''
+    def __init__(self, workers=None, algorithm='astar', heuristic='boundaries', maxSeconds=10, nodes=None):
+        '''
+        @param workers: number of worker processes, default: cores
+        @param algorithm: default algorithm of a request
+        @param heuristic: heuristic of the informed searches
+        @param maxSeconds: maximal (and default) deadline of a request
+        @param nodes: budget of expansions of a solve, None for no limit
+        '''
+        self.pool = ProcessPoolExecutor(workers or os.cpu_count() or 1)
+        self.algorithm = algorithm
+        self.heuristic = heuristic
+        self.maxSeconds = maxSeconds
+        self.nodes = nodes
+        self.running = {}
+        self.requests = 0
+        self.solves = 0
+        self.shared = 0
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        '''
+        Start the server
+        @return: the asyncio server; its port is server.sockets[0].getsockname()[1]
+        '''
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def handle(self, reader, writer):
+        '''
+        Handle a connection: every request line is solved by its own task
+        '''
+        lock = asyncio.Lock()
+        tasks = set()
+        number = 0
+        try:
+            while line := await reader.readline():
+                number += 1
+                task = asyncio.create_task(self.respond(line.decode(), number, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.CancelledError):
+            # connection lost or service shut down
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def respond(self, line, number, writer, lock):
+        try:
+            board = parse(line, number)
+            if board is None:
+                return
+            result = await self.solve(board)
+        except Exception as e:
+            result = {'id': number, 'status': 'error', 'error': repr(e)}
+        async with lock:
+            writer.write((json.dumps(result) + '\n').encode())
+            await writer.drain()
+
+    async def solve(self, board):
+        '''
+        Solve a board within the deadline of the request, shared with the concurrent requests for equal boards
+        @param board: dictionary of parse() with the optional fields algorithm and deadline
+        @return: result dictionary
+        '''
+        loop = asyncio.get_running_loop()
+        algorithm = board.get('algorithm', self.algorithm)
+        if algorithm not in algorithms:
+            raise ValueError(f'unknown algorithm {algorithm}')
+        end = loop.time() + min(float(board.get('deadline', self.maxSeconds)), self.maxSeconds)
+        state = State(*board['tubes'], size=board['size'], pourAll=board['pourAll'])
+        key = (state.key, state.size, state.pourAll, algorithm)
+        self.requests += 1
+        shared = False
+        while True:
+            solve = self.running.get(key)
+            if solve is None:
+                solve = self.start(key, board, state.tubes, algorithm, end)
+            else:
+                shared = True
+                self.shared += 1
+            solve.waiters += 1
+            try:
+                result = await asyncio.wait_for(asyncio.shield(solve.future), end - loop.time())
+            except asyncio.TimeoutError:
+                result = {'status': 'timeout'}
+            except Exception as e:
+                result = {'status': 'error', 'error': repr(e)}
+            finally:
+                solve.waiters -= 1
+                if solve.waiters == 0 and not solve.future.done():
+                    # nobody is waiting anymore; only effective as long as the solve waits for a worker
+                    solve.future.cancel()
+                    self.finished(key, solve)
+            if result['status'] == 'timeout' and solve.end < end and end - loop.time() > MinSeconds:
+                continue
+            break
+        result = dict(result, id=board['id'], shared=shared)
+        if 'moves' in result:
+            result['moves'] = remap(result['moves'], solve.tubes, state.tubes)
+        return result
+
+    def start(self, key, board, tubes, algorithm, end):
+        '''
+        Submit a new solve with the budget up to end to the pool; the worker gets the absolute deadline, so a solve
+        that waited in the queue of the pool stops at the same time as its requests
+        '''
+        loop = asyncio.get_running_loop()
+        deadline = time.time() + max(end - loop.time(), MinSeconds)
+        future = loop.run_in_executor(self.pool, solveBoard, board, algorithm, self.heuristic, 1, None, self.nodes,
+                                      deadline)
+        solve = Solve(future, tubes, end)
+        self.running[key] = solve
+        self.solves += 1
+        future.add_done_callback(lambda _: self.finished(key, solve))
+        return solve
+
+    def finished(self, key, solve):
+        if self.running.get(key) is solve:
+            del self.running[key]
+
+def remap(moves, tubes, target):
+    '''
+    Map the moves on a board with the given tubes to the tube order of the equal board target
+    @return: list of moves (i, j) on target
+    '''
+    index = {}
+    for k, tube in enumerate(target):
+        index.setdefault(tube, []).append(k)
+    perm = [index[tube].pop(0) for tube in tubes]
+    return [(perm[i], perm[j]) for i, j in moves]
+
+class SolveClient(object):
+    '''
+    Client of the solving service; any number of requests can wait concurrently on one connection
+    '''
+    def __init__(self):
+        self.pending = {}   # request id -> future of the response
+        self.count = 0
+
+    async def connect(self, host='127.0.0.1', port=8765):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.receiver = asyncio.create_task(self.receive())
+
+    async def receive(self):
+        while line := await self.reader.readline():
+            result = json.loads(line)
+            future = self.pending.pop(result['id'], None)
+            if future is not None and not future.done():
+                future.set_result(result)
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError('connection closed by the service'))
+
+    async def solve(self, state, algorithm=None, deadline=None):
+        '''
+        Solve the board of state by the service
+        @param algorithm: name of the search algorithm, None for the default of the service
+        @param deadline: seconds until the service answers with status timeout, None for its maximum
+        @return: result dictionary, see module description
+        '''
+        self.count += 1
+        request = {'id': self.count, 'tubes': [''.join(tube) for tube in state.tubes], 'size': state.size,
+                   'pourAll': state.pourAll}
+        if algorithm is not None:
+            request['algorithm'] = algorithm
+        if deadline is not None:
+            request['deadline'] = deadline
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.count] = future
+        self.writer.write((json.dumps(request) + '\n').encode())
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.receiver.cancel()
+
+def corpus(requests, duplicates, seed, size=4, emptyTubes=2, numColors=8):
+    '''
+    Boards of a load test: generated solvable boards, a part of them repeated with shuffled tubes
+    @param duplicates: fraction of the requests that repeat a former board
+    @return: list of states
+    '''
+    rng = random.Random(seed)
+    fresh = boards(requests, seed, size, emptyTubes, numColors)
+    states = []
+    for _ in range(requests):
+        if states and rng.random() < duplicates:
+            tubes = list(rng.choice(states).tubes)
+            rng.shuffle(tubes)
+            states.append(State(*tubes, size=size, pourAll=True))
+        else:
+            states.append(next(fresh)[0])
+    return states
+
+async def loadTest(host, port, requests=500, concurrency=50, duplicates=0.3, deadline=None, algorithm=None,
+                   seed=1):
+    '''
+    Send the boards of corpus() with at most concurrency requests in flight and print throughput and latencies;
+    every solution is checked by replaying its moves
+    '''
+    states = corpus(requests, duplicates, seed)
+    client = SolveClient()
+    await client.connect(host, port)
+    gate = asyncio.Semaphore(concurrency)
+    latencies, statuses = [], {}
+    shared = invalid = 0
+
+    async def one(state):
+        nonlocal shared, invalid
+        async with gate:
+            t = time.perf_counter()
+            result = await client.solve(state, algorithm, deadline)
+            latencies.append(time.perf_counter() - t)
+        statuses[result['status']] = statuses.get(result['status'], 0) + 1
+        shared += result['shared']
+        if result['status'] == 'solved':
+            node = state
+            for action in result['moves']:
+                node = node.move(*action)
+            invalid += not node.isGoal()
+
+    t = time.perf_counter()
+    await asyncio.gather(*(one(state) for state in states))
+    elapsed = time.perf_counter() - t
+    await client.close()
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies)-1, int(p * len(latencies)))]
+    print(f'loadtest: {requests} requests in {elapsed:.2f} s, {requests/elapsed:.1f} requests/s, '
+          f'p50={percentile(0.5)*1000:.1f} ms, p99={percentile(0.99)*1000:.1f} ms, max={latencies[-1]*1000:.1f} ms')
+    print(f'loadtest: status={statuses}, shared={shared}, invalid solutions={invalid}')
+
+async def serveForever(args):
+    service = SolveService(args.workers, args.algorithm, args.heuristic, args.time, args.nodes)
+    server = await service.serve(args.host, args.port)
+    print(f'solveservice: listening on {args.host}:{server.sockets[0].getsockname()[1]}')
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+async def runLoadTest(args):
+    service = server = None
+    port = args.port
+    if not args.connect:
+        # service within this process, its workers are separate processes anyway
+        service = SolveService(args.workers, args.algorithm, args.heuristic, args.time, args.nodes)
+        server = await service.serve(args.host, 0)
+        port = server.sockets[0].getsockname()[1]
+    try:
+        await loadTest(args.host, port, args.requests, args.concurrency, args.duplicates, args.deadline,
+                       args.algorithm, args.seed)
+    finally:
+        if service is not None:
+            print(f'solveservice: requests={service.requests}, solves={service.solves}, shared={service.shared}')
+            server.close()
+            service.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Asyncio solving service of the water-sort-puzzle')
+    parser.add_argument('command', choices=['serve', 'loadtest'])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes, default: cores')
+    parser.add_argument('--algorithm', choices=sorted(algorithms), default='astar')
+    parser.add_argument('--heuristic', default='boundaries')
+    parser.add_argument('--time', type=float, default=10, help='maximal deadline of a request in seconds')
+    parser.add_argument('--nodes', type=int, default=None, help='budget of expansions per solve')
+    parser.add_argument('--connect', action='store_true', help='loadtest: use the running service at host:port')
+    parser.add_argument('--requests', type=int, default=500, help='loadtest: number of requests')
+    parser.add_argument('--concurrency', type=int, default=50, help='loadtest: maximal requests in flight')
+    parser.add_argument('--duplicates', type=float, default=0.3, help='loadtest: fraction of repeated boards')
+    parser.add_argument('--deadline', type=float, default=None, help='loadtest: deadline of every request')
+    parser.add_argument('--seed', type=int, default=1, help='loadtest: seed of the boards')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serveForever(args) if args.command == 'serve' else runLoadTest(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+'''
+Background solver for the GUI
+
+The search runs in a separate worker process, so the Tk main loop is never blocked, however hard the board is.
+The worker sends messages through a multiprocessing queue that the GUI reads by poll() from a root.after callback:
+
+- ('progress', expansions, frontier, visited): every interval expansions
+- ('solution', moves):  every improved solution of the anytime search, shortened by pathopt.optimize(); moves is
+                        the list of actions (i, j)
+- ('done', moves):      at the end of the search with the best moves, None if no solution was found
+
+A running search is cancelled by cancel() or by starting the next one; the worker process is terminated and the
+messages still in its queue are discarded.
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import multiprocessing
+from queue import Empty
+
+from WaterColorPuzzleAfg.game.heuristics import zero
+from WaterColorPuzzleAfg.search.anytime import anytime
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+from WaterColorPuzzleAfg.search.instrument import Stats
+from WaterColorPuzzleAfg.search.pathopt import optimize
+
+class ProgressStats(Stats):
+    '''
+    Stats that send the counters to the queue of the GUI every interval expansions
+    '''
+    def __init__(self, queue, interval=500):
+        super().__init__('worker', timing=False, interval=interval)
+        self.queue = queue
+
+    def expanded(self, frontier, visited):
+        super().expanded(frontier, visited)
+        if self.expansions % self.interval == 0:
+            self.queue.put(('progress', self.expansions, frontier, visited))
+
+def work(start, h, seconds, queue):
+    '''
+    Main function of the worker process: anytime search on start, all results are sent to queue
+    '''
+    stats = ProgressStats(queue)
+    moves = None
+    for goal in anytime(start, h, seconds=seconds, stats=stats):
+        shortened = [node.action for node in reversed(backtrack(optimize(backtrack(goal)))[:-1])]
+        if moves is not None and len(moves) <= len(shortened):
+            continue
+        moves = shortened
+        queue.put(('solution', moves))
+    queue.put(('progress', stats.expansions, stats.frontier, stats.visited))
+    queue.put(('done', moves))
+
+class SolveWorker(object):
+    '''
+    Handle of at most one running search in a worker process
+    @ivar process: the running worker process, None if no search was started
+    @ivar queue: message queue of the running worker
+    '''
+    def __init__(self):
+        self.process = None
+        self.queue = None
+
+    def start(self, start, h=zero, seconds=None):
+        '''
+        Start the search on start in a new worker process; a running search is cancelled first
+        @param h: heuristic function, must be a module level function (it is pickled)
+        @param seconds: time budget of the anytime search, None for no limit
+        '''
+        self.cancel()
+        self.queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=work, args=(start, h, seconds, self.queue), daemon=True)
+        self.process.start()
+
+    def cancel(self):
+        '''
+        Terminate the running search, if any
+        '''
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join()
+            self.queue.close()
+        self.process = None
+        self.queue = None
+
+    def running(self):
+        return self.process is not None
+
+    def poll(self):
+        '''
+        Generator of all messages that arrived since the last call, it never blocks.
+        After the 'done' message the worker process is released.
+        '''
+        while self.queue is not None:
+            try:
+                message = self.queue.get_nowait()
+            except Empty:
+                if self.process.exitcode:
+                    # worker crashed without its 'done' message
+                    message = ('done', None)
+                else:
+                    return
+            if message[0] == 'done':
+                self.process.join()
+                self.process = None
+                self.queue = None
+            yield message
+
+
+# test code
+if __name__ == "__main__":
+    import time
+    from WaterColorPuzzleAfg.game.state import State
+    from WaterColorPuzzleAfg.game.heuristics import boundaries
+
+    worker = SolveWorker()
+    worker.start(State.create(4, 2, 16, pourAll=True), boundaries, seconds=3)
+    time.sleep(0.5)
+    print('cancel and restart')
+    worker.start(State.create(5, 2, 8), boundaries, seconds=3)
+    t = time.time()
+    while worker.running():
+        for message in worker.poll():
+            print(f'{time.time()-t:6.3f} s: {message[0]} {message[1:] if message[0] == "progress" else len(message[1] or [])}')
+        time.sleep(0.05)
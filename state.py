@@ -15,6 +15,7 @@ Created on 12.10.2022
 '''
 
 import random
+from bisect import bisect_left, insort
 
 class State(object):
     '''
@@ -23,35 +24,91 @@ class State(object):
     @ivar parent: parent state from which this state was created, default: None
     @ivar action: the action (a tuple of two tube-indexes:(from, to)) applied to the parent state and results in this node
     @ivar depth: numbering of moves from start state until goal state
+    @ivar pourAll: move mode; False: a move fills exactly one segment (capacity is not checked),
+                   True: a move fills the complete top run of one color up to the free capacity of the target tube
+    @cvar partialOrder: if True children() skips commuting moves in the wrong order, see moves(); the children
+                   then depend on the action of a state, set by the subclass PartialOrderState
     '''
-    def __init__(self, *tubes, size):
+    partialOrder = False
+
+    def __init__(self, *tubes, size, pourAll=False):
         '''
         Constructor of a game's state given a tuple of any tubes
         '''
         self.parent = None
         self.action = None
         self.depth  = 0
-        self.tubes = [list(tube) for tube in tubes]
+        self.tubes = tuple(tuple(tube) for tube in tubes)
         assert len(tubes)>=2
         self.size = size
+        self.pourAll = pourAll
+        self.key = tuple(sorted(self.tubes))
+        self._hash = tubesHash(self.tubes)
+        self.symbols = tuple(sorted({color for tube in self.tubes for color in tube}))
+        self._codes = {color: n+1 for n, color in enumerate(self.symbols)}
+
+    def _child(self, i, j, frTube, toTube):
+        '''
+        Internal fast constructor of the successor state where tube i is replaced by frTube and tube j by toTube.
+        All other tubes are shared with this state (tubes are immutable tuples); the canonical key is derived from
+        the key of this state by replacing the two changed tubes instead of sorting all tubes again, and the hash is
+        updated by the hashes of the two changed tubes only (see tubesHash), so no color segment of the other tubes is
+        read. The new tuples of the tubes and of the key copy only references.
+        '''
+        new_tubes = list(self.tubes)
+        new_tubes[i] = frTube
+        new_tubes[j] = toTube
+        new_state = State.__new__(type(self))
+        new_state.__dict__.update(self.__dict__)
+        new_state.tubes = tuple(new_tubes)
+        a, b = self.tubes[i], self.tubes[j]
+        new_state.key = replaceKey(self.key, (a, b), (frTube, toTube))
+        new_state._hash = (self._hash - hash(a) - hash(b) + hash(frTube) + hash(toTube)) & HashMask   # see tubesHash
+        new_state.parent = self
+        new_state.action = (i, j)
+        new_state.depth = self.depth + 1
+        return new_state
     
     def __str__(self):
         '''
         String representation of this state.
         '''
-        return '(' + ', '.join(f"{tube}" for tube in self.tubes) + ')'
+        return '(' + ', '.join(f"{list(tube)}" for tube in self.tubes) + ')'
     
     def __eq__(self, other):
         '''
         Checks two color-states if they are equal, not concerning the order of the tubes 
         '''
-        return sorted(self.tubes) == sorted(other.tubes)
+        return self.key == other.key
 
     def __hash__(self):
         '''
-        Calculates a hash-value of the color-state, the order of the tubes is ignored 
+        Returns the hash-value of the color-state, the order of the tubes is ignored (see tubesHash)
+        '''
+        return self._hash
+
+    def encode(self, canonical=False):
+        '''
+        Compact serialization of the tubes, e.g. to send states between processes: every color segment is a byte
+        (index+1 into symbols), every tube is terminated by a zero byte. 
+        @param canonical: if True the tubes of the canonical key are encoded, so equal states give equal bytes
+        @return: bytes object; restore the state with decode()
         '''
-        return hash(tuple(sorted(tuple(tube) for tube in self.tubes)))
+        codes = self._codes
+        data = bytearray()
+        for tube in (self.key if canonical else self.tubes):
+            data.extend(codes[color] for color in tube)
+            data.append(0)
+        return bytes(data)
+
+    def decode(self, data):
+        '''
+        Create a new state (without parent) from the bytes of encode(); size, move mode and colors are taken from 
+        this state, which must belong to the same puzzle. 
+        '''
+        symbols = self.symbols
+        tubes = [[symbols[code-1] for code in tube] for tube in data.split(b'\0')[:-1]]
+        return type(self)(*tubes, size=self.size, pourAll=self.pourAll)
 
     def get(self, i, j):
         '''
@@ -86,6 +143,77 @@ class State(object):
         '''
         return all(isSingleChar(tube) for tube in self.tubes)
 
+    def goals(self):
+        '''
+        Generates all canonical goal states with the same colors as this state: the segments of every color are
+        split into uniform tubes of at most size segments, the remaining tubes are empty. In legacy mode a move does
+        not check the capacity, so a uniform tube may be longer than size, up to all segments of its color.
+        '''
+        counts = {}
+        for tube in self.tubes:
+            for color in tube:
+                counts[color] = counts.get(color, 0) + 1
+        colors = sorted(counts)
+
+        def split(k, free):
+            # all combinations of uniform tubes for the colors k, k+1, ... using at most free tubes
+            if k == len(colors):
+                yield []
+                return
+            n = counts[colors[k]]
+            for parts in partitions(n, self.size if self.pourAll else n):
+                if len(parts) <= free:
+                    for rest in split(k+1, free-len(parts)):
+                        yield [(colors[k],)*n for n in parts] + rest
+
+        for tubes in split(0, len(self.tubes)):
+            tubes += [()] * (len(self.tubes) - len(tubes))
+            yield type(self)(*tubes, size=self.size, pourAll=self.pourAll)
+
+    def predecessors(self):
+        '''
+        Generates all states from which this state is reached by a single move, that is the reverse pours.
+        The parent of a predecessor is this state and its action is the (forward) move that leads to this state.
+        Predecessors are restricted to the moves that children() generates, especially the pruned moves of pourAll.
+        '''
+        for i, j, k in self.reverseMoves():
+            yield self.unpour(i, j, k)
+
+    def reverseMoves(self):
+        '''
+        Generates the reverse pours of predecessors() without creating the states, as tuples (i, j, k): 
+        the top k segments of tube j are put back onto tube i, so the forward move (i, j) pours exactly k segments.
+        '''
+        tubes, size, pourAll = self.tubes, self.size, self.pourAll
+        lengths = [len(tube) for tube in tubes]
+        tops = [tube[-1] if tube else None for tube in tubes]
+        for j, to in enumerate(tubes):
+            m = lengths[j]
+            if m == 0:
+                continue
+            color = tops[j]
+            run = runLength(to)
+            # the rest of tube j must be empty or have the same color on top: k < run or the complete tube
+            for k in range(1, (run if run < m else m+1) if pourAll else (2 if run > 1 or m == 1 else 1)):
+                for i, fr in enumerate(tubes):
+                    if i == j:
+                        continue
+                    if pourAll:
+                        # the forward move must pour exactly k segments and must not be pruned
+                        n = lengths[i] + k
+                        if n > size or (tops[i] == color and m != size):
+                            continue
+                        if (n == size or k == m) and (n == k or tops[i] == color and isSingleChar(fr)):
+                            continue
+                    yield i, j, k
+
+    def unpour(self, i, j, k):
+        '''
+        Reverse pour: the predecessor state where the top k segments of tube j are put back onto tube i
+        '''
+        to = self.tubes[j]
+        return self._child(i, j, self.tubes[i] + to[-k:], to[:-k])
+
     def move(self, i, j):
         '''
         Fill one amount of water-color from tube i into tube j.
@@ -94,58 +222,93 @@ class State(object):
         if not (0 <= i < len(self.tubes) and 0 <= j < len(self.tubes) and i != j):
             raise ValueError("Invalid move: Tube indices out of range or equal.")
         
-        frTube = list(self.tubes[i])
-        toTube = list(self.tubes[j])
+        frTube = self.tubes[i]
+        toTube = self.tubes[j]
 
         if len(frTube) > 0 and (len(toTube) == 0 or frTube[-1] == toTube[-1]):
-            color = frTube.pop()
-            toTube.append(color)
+            n = min(runLength(frTube), self.size - len(toTube)) if self.pourAll else 1
+            if n > 0:
+                toTube = toTube + frTube[-n:]
+                frTube = frTube[:-n]
 
-        new_tubes = list(self.tubes)
-        new_tubes[i] = tuple(frTube)
-        new_tubes[j] = tuple(toTube)
+        return self._child(i, j, frTube, toTube)
 
-        new_state = State(*new_tubes, size=self.size)
-        new_state.parent = self
-        new_state.action = (i, j)
-        new_state.depth = self.depth + 1
-        return new_state
-                      
     def children(self):
         '''
-        Generates all possible successor states by filling water-colors from tube i to tube j, if possible. 
-        Generator method that yields a sequence of successor states given a current state (self) 
+        Generates all possible successor states by filling water-colors from tube i to tube j, if possible.
+        Generator method that yields a sequence of successor states given a current state (self)
         '''
-        empty_tubes = [i for i in range(len(self.tubes)) if len(self.tubes[i]) == 0]
-        non_empty_tubes = [i for i in range(len(self.tubes)) if len(self.tubes[i]) > 0]
-    
-    # Prioritize moving to empty tubes
-        for i in non_empty_tubes:
-            for j in empty_tubes:
-                yield self.move(i, j)
-    
-    # Then move to tubes with the same color on top
-        for i in non_empty_tubes:
-            for j in non_empty_tubes:
-                if i != j and self.tubes[i][-1] == self.tubes[j][-1]:
-                    yield self.move(i, j)
-    
-    # Finally, consider all other moves
-        for i in non_empty_tubes:
-            for j in non_empty_tubes:
-                if i != j and self.tubes[i][-1] != self.tubes[j][-1]:
-                    yield self.move(i, j)
-    
-    
+        for i, j in self.moves():
+            yield self.move(i, j)
+
+    def moves(self):
+        '''
+        Generates the moves (i, j) of children() before any child state is created. 
+        Legacy mode: first the moves into empty tubes, then the moves onto the same color; moves onto a different
+        color change nothing and are skipped.
+        pourAll mode: only legal moves, provably useless moves are dropped:
+        - pouring out of a complete tube (filled up to size with a single color)
+        - pouring a uniform tube into an empty tube
+        - pouring into a full tube or onto a different color
+        Identical tubes are interchangeable in both modes: only the first of them is used as source and as target
+        (the second one if the source is the first), e.g. one of all empty tubes. With partialOrder a move on two
+        tubes not touched by the last action is skipped if it is ordered before this action, because both orders
+        of the two moves lead to the same state.
+        '''
+        tubes, size = self.tubes, self.size
+        first = {}
+        second = {}
+        for k, tube in enumerate(tubes):
+            if tube in first:
+                second.setdefault(tube, k)
+            else:
+                first[tube] = k
+        last = self.action if self.partialOrder else None
+
+        def keep(i, j):
+            to = tubes[j]
+            if first[to] != j and (to != tubes[i] or second[to] != j):
+                return False
+            return last is None or i in last or j in last or (i, j) > last
+
+        if self.pourAll:
+            for i, fr in enumerate(tubes):
+                if first[fr] != i or len(fr) == 0 or (len(fr) == size and isSingleChar(fr)):
+                    continue
+                uniform = isSingleChar(fr)
+                for j, to in enumerate(tubes):
+                    if i != j and (0 < len(to) < size and fr[-1] == to[-1] or len(to) == 0 and not uniform) \
+                            and keep(i, j):
+                        yield i, j
+            return
+        sources = [i for i, fr in enumerate(tubes) if len(fr) > 0 and first[fr] == i]
+        for i in sources:
+            for j, to in enumerate(tubes):
+                if len(to) == 0 and keep(i, j):
+                    yield i, j
+        for i in sources:
+            for j, to in enumerate(tubes):
+                if i != j and len(to) > 0 and tubes[i][-1] == to[-1] and keep(i, j):
+                    yield i, j
+
     @classmethod
-    def create(cls, sizeOfTube, emptyTubes, numColors):
+    def create(cls, sizeOfTube, emptyTubes, numColors, pourAll=False):
         '''
     Create a new game state randomly that uses the given parameter
+    In pourAll mode the colors are shuffled into numColors full tubes and the empty tubes are really empty,
+    otherwise the blanks of the empty tubes are shuffled together with the colors.
     @param sizeOfTube: maximum number of color segments within a single tube (height)
     @param emptyTubes: number of empty tubes
     @param numColors: total number of different colors
-    @return: a random game state  
+    @param pourAll: move mode of the created state
+    @return: a random game state
     '''
+        if pourAll:
+            all_colors = [chr(ord('A') + i) for i in range(numColors)] * sizeOfTube
+            random.shuffle(all_colors)
+            tubes_list = [all_colors[i:i+sizeOfTube] for i in range(0, len(all_colors), sizeOfTube)] + [''] * emptyTubes
+            return cls(*tubes_list, size=sizeOfTube, pourAll=True)
+
     # Create a list of all possible colors
         all_colors = [chr(ord('A') + i) for i in range(numColors)]
     
@@ -164,9 +327,64 @@ class State(object):
     
         return cls(*tubes_list, size=sizeOfTube)
 
+
+class PartialOrderState(State):
+    '''
+    State whose children() skip the commuting moves in non canonical order (partial order reduction). 
+    The set of reachable states and their depths are the same as of State, but fewer duplicate children are
+    generated. As the children depend on the action, searches that replay a path by children(), like
+    bidisearch.stitch() or leansearch.replay(), need State.
+    '''
+    partialOrder = True
+
+
+def replaceKey(key, old, new):
+    '''
+    Replace the tubes old by the tubes new within the sorted canonical key; the result is sorted again.
+    Binary search finds the positions, only references of the other tubes are copied.
+    @param key: sorted tuple of tubes
+    @param old: tubes to remove, must be contained in key
+    @param new: tubes to insert 
+    '''
+    li = list(key)
+    for tube in old:
+        del li[bisect_left(li, tube)]
+    for tube in new:
+        insort(li, tube)
+    return tuple(li)
     
+HashMask = (1 << 64) - 1
+
+def tubesHash(tubes):
+    '''
+    Order independent hash of a state: the sum of the hashes of its tubes modulo 2**64. A child state updates the
+    hash of its parent by subtracting the hashes of the two old tubes and adding the ones of the two new tubes.
+    '''
+    return sum(map(hash, tubes)) & HashMask
+
+def runLength(tube):
+    '''
+    Number of segments of the same color on top of a non empty tube
+    '''
+    n = 1
+    while n < len(tube) and tube[-n-1] == tube[-1]:
+        n += 1
+    return n
+
+def partitions(n, size):
+    '''
+    Generates all splits of n segments into tubes of at most size segments, as non increasing tuples of tube lengths
+    '''
+    if n == 0:
+        yield ()
+        return
+    for first in range(min(n, size), 0, -1):
+        for rest in partitions(n-first, first):
+            yield (first,) + rest
+
 def isSingleChar(text):
     return all(text[ch] == text[0] for ch in range(1, len(text)))
 
-state = State.create(sizeOfTube=4, emptyTubes=2, numColors=5)
-print(state)
+if __name__ == "__main__":
+    state = State.create(sizeOfTube=4, emptyTubes=2, numColors=5)
+    print(state)
@@ -0,0 +1,318 @@
+'''
+Compact representation of a game state of the color-sort-puzzle
+
+Alternative implementation of the State class with the same node contract (isGoal, children, __eq__, __hash__, parent,
+action, depth, get, tubeCount, tubeSize). Every tube is packed into a single integer with one nibble per color segment:
+the bottom segment is the most significant nibble, the top segment the least significant one.
+So tube 'BFDC' is written as 0x2643 (A=1, B=2, ...); the code 0 is never a color, an empty tube is 0.
+If there are more than 15 different colors, the width of a segment grows to 5 or more bits.
+
+The canonical key (sorted tuple of tubes, the order of the tubes is ignored) and its hash are calculated once
+when a state is created and stored within the __slots__ of the object.
+
+Examples:
+State(0x2643, 0x32, 0x4535, 0x212, 0x131, 0x46, 0x456, 0x165, size=4)
+State('BFDC', 'CB', 'DECE', 'BAB', 'ACA', 'DF', 'DEF', 'AFE', size=4)
+
+Created on 17.10.2026
+@author: beh
+'''
+
+import random
+
+from WaterColorPuzzleAfg.game.state import HashMask, replaceKey, tubesHash
+
+class Coding(object):
+    '''
+    Mapping between the color symbols and the packed integer codes; shared by all states of one puzzle.
+    @ivar bits: number of bits for a single color segment
+    @ivar mask: bit mask of a single color segment
+    @ivar size: maximum number of color segments within a tube
+    @ivar symbols: color symbol of every code, symbols[0] is None (empty)
+    @ivar codes: code of every color symbol
+    @ivar ones: ones[n] is the integer with n segments of code 1; a uniform tube of color c is c*ones[n]
+    @ivar pourAll: move mode, see state.State
+    '''
+    __slots__ = ('bits', 'mask', 'size', 'symbols', 'codes', 'ones', 'pourAll')
+
+    def __init__(self, symbols, size, segments, pourAll=False):
+        '''
+        @param symbols: sequence of all color symbols, index 0 must be None
+        @param size: maximum number of color segments within a tube
+        @param segments: total number of color segments of the puzzle, that is the longest possible tube
+        @param pourAll: move mode
+        '''
+        self.bits = max(4, (len(symbols)-1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.size = size
+        self.pourAll = pourAll
+        self.symbols = tuple(symbols)
+        self.codes = {s: c for c, s in enumerate(self.symbols) if c > 0}
+        self.ones = [0]
+        for _ in range(segments):
+            self.ones.append((self.ones[-1] << self.bits) | 1)
+
+    def length(self, tube):
+        '''
+        Number of color segments of a packed tube
+        '''
+        return (tube.bit_length() + self.bits - 1) // self.bits
+
+    def runLength(self, tube):
+        '''
+        Number of segments of the same color on top of a non empty packed tube
+        '''
+        top, n = tube & self.mask, 1
+        tube >>= self.bits
+        while tube & self.mask == top:
+            tube >>= self.bits
+            n += 1
+        return n
+
+    def isUniform(self, tube):
+        '''
+        Check if a packed tube is empty or filled with a single color only
+        '''
+        return tube == (tube & self.mask) * self.ones[self.length(tube)]
+
+    def pack(self, tube):
+        '''
+        Pack a sequence of color symbols (bottom first) into an integer
+        '''
+        t = 0
+        for s in tube:
+            t = (t << self.bits) | self.codes[s]
+        return t
+
+    def unpack(self, tube):
+        '''
+        Unpack an integer into a list of color symbols (bottom first)
+        '''
+        li = []
+        while tube:
+            li.append(self.symbols[tube & self.mask])
+            tube >>= self.bits
+        li.reverse()
+        return li
+
+
+class State(object):
+    '''
+    Object representing a puzzle state, that is the color distribution in different tubes.
+    Implementation as an immutable tuple of packed integers
+    @ivar parent: parent state from which this state was created, default: None
+    @ivar action: the action (a tuple of two tube-indexes:(from, to)) applied to the parent state and results in this node
+    @ivar depth: numbering of moves from start state until goal state
+    @ivar tubes: tuple of packed tubes
+    @ivar key: canonical key, the sorted tuple of packed tubes
+    '''
+    __slots__ = ('parent', 'action', 'depth', 'tubes', 'key', '_hash', 'coding')
+    partialOrder = False
+
+    def __init__(self, *tubes, size=None, pourAll=False):
+        '''
+        Constructor of a game's state given a tuple of tubes; either packed integers or sequences of color symbols
+        '''
+        assert len(tubes)>=2
+        if all(isinstance(tube, int) for tube in tubes):
+            symbols = (None,) + tuple(range(1, 16))
+            segments = sum((tube.bit_length()+3)//4 for tube in tubes)
+        else:
+            symbols = (None,) + tuple(sorted({s for tube in tubes for s in tube}))
+            segments = sum(len(tube) for tube in tubes)
+        coding = Coding(symbols, size, segments, pourAll)
+        packed = tuple(tube if isinstance(tube, int) else coding.pack(tube) for tube in tubes)
+        if size is None:
+            coding.size = max(coding.length(tube) for tube in packed)
+        self._init(packed, coding)
+        self.parent = None
+        self.action = None
+        self.depth  = 0
+
+    def _init(self, tubes, coding):
+        self.tubes = tubes
+        self.coding = coding
+        self.key = tuple(sorted(tubes))
+        self._hash = tubesHash(tubes)
+
+    def _child(self, i, j, fr, to):
+        '''
+        Internal fast constructor of the successor state where tube i is replaced by fr and tube j by to.
+        The coding is shared with this state; the canonical key and the hash are derived from the ones of this state.
+        '''
+        new_tubes = list(self.tubes)
+        new_tubes[i] = fr
+        new_tubes[j] = to
+        child = State.__new__(State)
+        child.tubes = tuple(new_tubes)
+        child.coding = self.coding
+        a, b = self.tubes[i], self.tubes[j]
+        child.key = replaceKey(self.key, (a, b), (fr, to))
+        child._hash = (self._hash - hash(a) - hash(b) + hash(fr) + hash(to)) & HashMask   # see tubesHash
+        child.parent = self
+        child.action = (i, j)
+        child.depth  = self.depth + 1
+        return child
+
+    @property
+    def size(self):
+        return self.coding.size
+
+    @property
+    def pourAll(self):
+        return self.coding.pourAll
+
+    def __str__(self):
+        '''
+        String representation of this state.
+        '''
+        return '(' + ', '.join(f"{self.coding.unpack(tube)}" for tube in self.tubes) + ')'
+
+    def __eq__(self, other):
+        '''
+        Checks two color-states if they are equal, not concerning the order of the tubes
+        '''
+        return self.key == other.key
+
+    def __hash__(self):
+        '''
+        Returns the stored hash-value of the tubes; the order of the tubes is ignored (see state.tubesHash)
+        '''
+        return self._hash
+
+    def get(self, i, j):
+        '''
+        Return the color symbol of tube i at position j. If position is empty, None is returned.
+        @param i: tube index 0, 1, ... tubeCount()-1
+        @param j: position index 0, 1, ... tubeSize()-1
+        @return: corresponding color symbol; or None if empty
+        @raise IndexError: if index i is out of range
+        '''
+        tube = self.tubes[i]
+        n = self.coding.length(tube)
+        if j < n:
+            return self.coding.symbols[(tube >> ((n-1-j)*self.coding.bits)) & self.coding.mask]
+        else:
+            return None
+
+    def tubeCount(self):
+        '''
+        Return the total number of tubes.
+        '''
+        return len(self.tubes)
+
+    def tubeSize(self):
+        '''
+        Get the maximum number of color segments within a tube.
+        '''
+        return self.coding.length(max(self.tubes, key=self.coding.length))
+
+    def isGoal(self):
+        '''
+        Check if all tubes are completely filled with the same color or empty
+        '''
+        return all(self.coding.isUniform(tube) for tube in self.tubes)
+
+    def move(self, i, j):
+        '''
+        Fill one amount of water-color from tube i into tube j.
+        Or fill complete color segments of the same color from i to j (pourAll mode).
+        '''
+        if not (0 <= i < len(self.tubes) and 0 <= j < len(self.tubes) and i != j):
+            raise ValueError("Invalid move: Tube indices out of range or equal.")
+        fr, to = self.tubes[i], self.tubes[j]
+        coding = self.coding
+        mask = coding.mask
+        if fr and (not to or fr & mask == to & mask):
+            n = min(coding.runLength(fr), coding.size - coding.length(to)) if coding.pourAll else 1
+            if n > 0:
+                bits = n * coding.bits
+                fr, to = fr >> bits, (to << bits) | (fr & mask) * coding.ones[n]
+        return self._child(i, j, fr, to)
+
+    def children(self):
+        '''
+        Generates all possible successor states by filling water-colors from tube i to tube j, if possible.
+        Generator method that yields a sequence of successor states given a current state (self)
+        '''
+        for i, j in self.moves():
+            yield self.move(i, j)
+
+    def moves(self):
+        '''
+        Generates the moves (i, j) of children() before any child state is created; the same moves in the same
+        order as state.State.moves()
+        '''
+        tubes, coding = self.tubes, self.coding
+        mask, size = coding.mask, coding.size
+        first = {}
+        second = {}
+        for k, tube in enumerate(tubes):
+            if tube in first:
+                second.setdefault(tube, k)
+            else:
+                first[tube] = k
+        last = self.action if self.partialOrder else None
+
+        def keep(i, j):
+            to = tubes[j]
+            if first[to] != j and (to != tubes[i] or second[to] != j):
+                return False
+            return last is None or i in last or j in last or (i, j) > last
+
+        if coding.pourAll:
+            for i, fr in enumerate(tubes):
+                if first[fr] != i or fr == 0:
+                    continue
+                uniform = coding.isUniform(fr)
+                if uniform and coding.length(fr) == size:
+                    continue
+                for j, to in enumerate(tubes):
+                    if i == j:
+                        continue
+                    if (to and fr & mask == to & mask and coding.length(to) < size or not to and not uniform) \
+                            and keep(i, j):
+                        yield i, j
+            return
+        sources = [i for i, fr in enumerate(tubes) if fr and first[fr] == i]
+        for i in sources:
+            for j, to in enumerate(tubes):
+                if not to and keep(i, j):
+                    yield i, j
+        for i in sources:
+            for j, to in enumerate(tubes):
+                if i != j and to and tubes[i] & mask == to & mask and keep(i, j):
+                    yield i, j
+
+    @classmethod
+    def create(cls, sizeOfTube, emptyTubes, numColors, pourAll=False):
+        '''
+        Create a new game state randomly that uses the given parameter; same distribution as state.State.create()
+        @param sizeOfTube: maximum number of color segments within a single tube (height)
+        @param emptyTubes: number of empty tubes
+        @param numColors: total number of different colors
+        @param pourAll: move mode of the created state
+        @return: a random game state
+        '''
+        if pourAll:
+            all_colors = [chr(ord('A') + i) for i in range(numColors)] * sizeOfTube
+            random.shuffle(all_colors)
+            tubes_list = [all_colors[i:i+sizeOfTube] for i in range(0, len(all_colors), sizeOfTube)] + [''] * emptyTubes
+            return cls(*tubes_list, size=sizeOfTube, pourAll=True)
+        all_colors = [chr(ord('A') + i) for i in range(numColors)]
+        all_colors = list((''.join(all_colors) + (" " * emptyTubes)) * sizeOfTube)
+        random.shuffle(all_colors)
+        tubes_list = [''.join(all_colors[i:i+sizeOfTube]) for i in range(0, len(all_colors), sizeOfTube)]
+        return cls(*tubes_list, size=sizeOfTube)
+
+
+# test code
+if __name__ == "__main__":
+    start = State(0x2643, 0x32, 0x4535, 0x212, 0x131, 0x46, 0x456, 0x165, size=4)
+    print(f'start = {start}, hash={hash(start)}')
+    same = State('BFDC', 'CB', 'DECE', 'BAB', 'ACA', 'DF', 'DEF', 'AFE', size=4)
+    print(f'equal to symbol version: {start == same}')
+    print(f'get(0,0)={same.get(0,0)}, tubeCount={same.tubeCount()}, tubeSize={same.tubeSize()}')
+    print(f'isGoal: {start.isGoal()}, {State("AAA", "BB", "", "B", size=3).isGoal()}')
+    for child in same.children():
+        print(child, child.action)
@@ -12,21 +12,35 @@ from tkinter import ttk
 
 from WaterColorPuzzleAfg.view.display import WaterSortCanvas
 from WaterColorPuzzleAfg.game.state import State
-from WaterColorPuzzleAfg.search.dfsearch import dfsVerbose, backtrack
+from WaterColorPuzzleAfg.game.heuristics import boundaries
+from WaterColorPuzzleAfg.search.bfsearch import backtrack
+from WaterColorPuzzleAfg.search.solvecache import SolutionCache
+from WaterColorPuzzleAfg.search.solveworker import SolveWorker
+
+SolveSeconds = 2   # time budget of the anytime search
+PollMillis = 50    # interval of polling the messages of the solver worker
 
 start = None
 solution = []
+stepped = False    # True as soon as the first move of the solution is shown
+cache = None
+worker = None
 
 def solve():
     '''
     Command for button 'solve'
     '''
-    global solution, start, canvas
+    global solution, start, canvas, stepped
     # print(f"solve called: solution length={len(solution)}")
     if len(solution) == 0:
         return
+    stepped = True
     # show solution
-    canvas.update(solution.pop())
+    node = solution.pop()
+    if node.action is None:
+        canvas.update(node)
+    else:
+        canvas.animate(node, node.action)
     if solution:
         nx = solution[-1]
         canvas.show(*nx.action)
@@ -37,31 +51,84 @@ def create():
     
     '''Command for button 'shuffle'''
     
-    global solution, start, canvas
+    global solution, start, canvas, stepped
     # TODO: replace by your own implementation of State
     start = State.create(5, 2, 8)
     canvas.initialize(start)
     canvas.show(0, 0)
-    goal = dfsVerbose(start)
-    solution = backtrack(goal)
+    solution = []
+    stepped = False
+    worker.cancel()
+    found, moves = cache.lookup(start)
+    print(f'cache: hits={cache.hits}, misses={cache.misses}, hit rate={cache.hitRate():.2f}')
+    if found:
+        setSolution(moves)
+        status.set('no solution' if moves is None else 'solution from cache')
+    else:
+        solveButton.state(['disabled'])
+        status.set('solving ...')
+        worker.start(start, boundaries, SolveSeconds)
+
+def setSolution(moves):
+    '''
+    Replay the moves from start and make the solution available for button 'solve'; 
+    an improved solution replaces the old one only as long as no move has been shown
+    '''
+    global solution
+    if moves is None or stepped or (solution and len(solution)-1 <= len(moves)):
+        return
+    node = start
+    for action in moves:
+        node = node.move(*action)
+    solution = backtrack(node)
+    solveButton.state(['!disabled'])
+
+def poll():
+    '''
+    Handle the messages of the solver worker; called periodically by the Tk main loop
+    '''
+    for message in worker.poll():
+        if message[0] == 'progress':
+            _, expansions, frontier, visited = message
+            status.set(f'solving: expansions={expansions}, frontier={frontier}, visited={visited}')
+        elif message[0] == 'solution':
+            setSolution(message[1])
+        else:
+            moves = message[1]
+            if moves is not None:
+                cache.store(start, moves)
+                status.set(f'solved: {len(moves)} moves')
+            else:
+                status.set('no solution found')
+    root.after(PollMillis, poll)
+
 
+if __name__ == "__main__":
+    cache = SolutionCache()
+    worker = SolveWorker()
 
-root = tk.Tk()
-root.title("Water Sort Puzzle")
-root.columnconfigure(0, weight=1)
-root.rowconfigure(0, weight=1)
+    root = tk.Tk()
+    root.title("Water Sort Puzzle")
+    root.columnconfigure(0, weight=1)
+    root.rowconfigure(0, weight=1)
 
-mainframe = ttk.Frame(root, padding="3 3 3 3")
-mainframe.grid(column=0, row=0, sticky=('N', 'W', 'E', 'S'))
-mainframe.columnconfigure(0, weight=1)
-mainframe.columnconfigure(1, weight=1) 
-mainframe.rowconfigure(0, weight=1)
+    mainframe = ttk.Frame(root, padding="3 3 3 3")
+    mainframe.grid(column=0, row=0, sticky=('N', 'W', 'E', 'S'))
+    mainframe.columnconfigure(0, weight=1)
+    mainframe.columnconfigure(1, weight=1) 
+    mainframe.rowconfigure(0, weight=1)
 
-canvas = WaterSortCanvas(mainframe)
-canvas.grid(column=0, row=0, columnspan=2, sticky=('N', 'W', 'E', 'S'))
-create()
+    canvas = WaterSortCanvas(mainframe)
+    canvas.grid(column=0, row=0, columnspan=2, sticky=('N', 'W', 'E', 'S'))
 
-ttk.Button(mainframe, text="Shuffle", command=create).grid(column=0, row=1)
-ttk.Button(mainframe, text="Solve", command=solve).grid(column=1, row=1)
+    status = tk.StringVar()
+    ttk.Button(mainframe, text="Shuffle", command=create).grid(column=0, row=1)
+    solveButton = ttk.Button(mainframe, text="Solve", command=solve)
+    solveButton.grid(column=1, row=1)
+    ttk.Label(mainframe, textvariable=status).grid(column=0, row=2, columnspan=2)
+    create()
 
-root.mainloop()
+    root.after(PollMillis, poll)
+    root.mainloop()
+    worker.cancel()
+    cache.close()